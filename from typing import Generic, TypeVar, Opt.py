@@ -1,321 +1,3513 @@
-from typing import Generic, TypeVar, Optional, List, Dict, Tuple
-
-T = TypeVar('T')
-
-# ==================== ООП РЕАЛИЗАЦИЯ ====================
-
-class Queue(Generic[T]):
-    """Очередь FIFO (First-In-First-Out) - ООП стиль"""
-    
-    def __init__(self) -> None:
-        self.items: List[T] = []
-    
-    def enqueue(self, item: T) -> None:
-        """Добавить элемент в конец очереди"""
-        self.items.append(item)
-    
-    def dequeue(self) -> Optional[T]:
-        """Удалить и вернуть первый элемент"""
-        if self.is_empty():
-            return None
-        return self.items.pop(0)
-    
-    def peek(self) -> Optional[T]:
-        """Посмотреть первый элемент без удаления"""
-        if self.is_empty():
-            return None
-        return self.items[0]
-    
-    def is_empty(self) -> bool:
-        """Проверить, пуста ли очередь"""
-        return len(self.items) == 0
-    
-    def size(self) -> int:
-        """Получить размер очереди"""
-        return len(self.items)
-    
-    def __str__(self) -> str:
-        return f"Queue({self.items})"
-
-
-class Stack(Generic[T]):
-    """Стек LIFO (Last-In-First-Out) - ООП стиль"""
-    
-    def __init__(self) -> None:
-        self.items: List[T] = []
-    
-    def push(self, item: T) -> None:
-        """Добавить элемент на вершину стека"""
-        self.items.append(item)
-    
-    def pop(self) -> Optional[T]:
-        """Удалить и вернуть верхний элемент"""
-        if self.is_empty():
-            return None
-        return self.items.pop()
-    
-    def peek(self) -> Optional[T]:
-        """Посмотреть верхний элемент без удаления"""
-        if self.is_empty():
-            return None
-        return self.items[-1]
-    
-    def is_empty(self) -> bool:
-        """Проверить, пуст ли стек"""
-        return len(self.items) == 0
-    
-    def size(self) -> int:
-        """Получить размер стека"""
-        return len(self.items)
-    
-    def __str__(self) -> str:
-        return f"Stack({self.items})"
-
-
-# ==================== ФУНКЦИОНАЛЬНАЯ РЕАЛИЗАЦИЯ ====================
-
-# Типы данных для функционального стиля
-QueueDict = Dict[str, List[T]]
-StackDict = Dict[str, List[T]]
-
-# ---------- Функции для работы с очередью ----------
-
-def create_queue() -> QueueDict[T]:
-    """Создать новую пустую очередь - функциональный стиль"""
-    return {"items": []}
-
-def queue_enqueue(queue: QueueDict[T], item: T) -> QueueDict[T]:
-    """Добавить элемент в конец очереди"""
-    new_items = queue["items"].copy()  # Создаем копию для иммутабельности
-    new_items.append(item)
-    return {"items": new_items}
-
-def queue_dequeue(queue: QueueDict[T]) -> Tuple[Optional[T], QueueDict[T]]:
-    """Удалить и вернуть первый элемент из очереди"""
-    if len(queue["items"]) == 0:
-        return None, queue
-    
-    new_items = queue["items"].copy()
-    item = new_items.pop(0)
-    return item, {"items": new_items}
-
-def queue_peek(queue: QueueDict[T]) -> Optional[T]:
-    """Посмотреть первый элемент без удаления"""
-    if len(queue["items"]) == 0:
-        return None
-    return queue["items"][0]
-
-def queue_is_empty(queue: QueueDict[T]) -> bool:
-    """Проверить, пуста ли очередь"""
-    return len(queue["items"]) == 0
-
-def queue_size(queue: QueueDict[T]) -> int:
-    """Получить размер очереди"""
-    return len(queue["items"])
-
-def queue_to_string(queue: QueueDict[T]) -> str:
-    """Представить очередь в виде строки"""
-    return f"Queue({queue['items']})"
-
-# ---------- Функции для работы со стеком ----------
-
-def create_stack() -> StackDict[T]:
-    """Создать новый пустой стек - функциональный стиль"""
-    return {"items": []}
-
-def stack_push(stack: StackDict[T], item: T) -> StackDict[T]:
-    """Добавить элемент на вершину стека"""
-    new_items = stack["items"].copy()  # Создаем копию для иммутабельности
-    new_items.append(item)
-    return {"items": new_items}
-
-def stack_pop(stack: StackDict[T]) -> Tuple[Optional[T], StackDict[T]]:
-    """Удалить и вернуть верхний элемент стека"""
-    if len(stack["items"]) == 0:
-        return None, stack
-    
-    new_items = stack["items"].copy()
-    item = new_items.pop()
-    return item, {"items": new_items}
-
-def stack_peek(stack: StackDict[T]) -> Optional[T]:
-    """Посмотреть верхний элемент без удаления"""
-    if len(stack["items"]) == 0:
-        return None
-    return stack["items"][-1]
-
-def stack_is_empty(stack: StackDict[T]) -> bool:
-    """Проверить, пуст ли стек"""
-    return len(stack["items"]) == 0
-
-def stack_size(stack: StackDict[T]) -> int:
-    """Получить размер стека"""
-    return len(stack["items"])
-
-def stack_to_string(stack: StackDict[T]) -> str:
-    """Представить стек в виде строки"""
-    return f"Stack({stack['items']})"
-
-
-# ==================== ДЕМОНСТРАЦИЯ И СРАВНЕНИЕ ====================
-
-def print_separator(title: str) -> None:
-    """Напечатать разделитель"""
-    print("\n" + "="*50)
-    print(f" {title} ")
-    print("="*50)
-
-def demonstrate_oop() -> None:
-    """Демонстрация ООП подхода"""
-    print_separator("ООП ПОДХОД")
-    
-    print("1. ОЧЕРЕДЬ (FIFO):")
-    q = Queue[int]()
-    print(f"Создана пустая очередь: {q}")
-    print(f"Очередь пуста? {q.is_empty()}")
-    
-    # Добавляем элементы
-    for i in [10, 20, 30]:
-        q.enqueue(i)
-        print(f"Добавили {i}: {q}")
-    
-    print(f"\nПервый элемент (peek): {q.peek()}")
-    print(f"Размер очереди: {q.size()}")
-    
-    # Извлекаем элементы
-    print("\nИзвлечение элементов:")
-    while not q.is_empty():
-        item = q.dequeue()
-        print(f"Извлекли {item}: {q}")
-    
-    print("\n2. СТЕК (LIFO):")
-    s = Stack[str]()
-    print(f"Создан пустой стек: {s}")
-    
-    # Добавляем элементы
-    for char in ['A', 'B', 'C']:
-        s.push(char)
-        print(f"Добавили '{char}': {s}")
-    
-    print(f"\nВерхний элемент (peek): {s.peek()}")
-    print(f"Размер стека: {s.size()}")
-    
-    # Извлекаем элементы
-    print("\nИзвлечение элементов:")
-    while not s.is_empty():
-        item = s.pop()
-        print(f"Извлекли '{item}': {s}")
-
-def demonstrate_functional() -> None:
-    """Демонстрация функционального подхода"""
-    print_separator("ФУНКЦИОНАЛЬНЫЙ ПОДХОД")
-    
-    print("1. ОЧЕРЕДЬ (FIFO):")
-    q = create_queue()
-    print(f"Создана пустая очередь: {queue_to_string(q)}")
-    print(f"Очередь пуста? {queue_is_empty(q)}")
-    
-    # Добавляем элементы (создаем новые очереди)
-    q = queue_enqueue(q, 10)
-    print(f"Добавили 10: {queue_to_string(q)}")
-    q = queue_enqueue(q, 20)
-    print(f"Добавили 20: {queue_to_string(q)}")
-    q = queue_enqueue(q, 30)
-    print(f"Добавили 30: {queue_to_string(q)}")
-    
-    print(f"\nПервый элемент (peek): {queue_peek(q)}")
-    print(f"Размер очереди: {queue_size(q)}")
-    
-    # Извлекаем элементы
-    print("\nИзвлечение элементов:")
-    while not queue_is_empty(q):
-        item, q = queue_dequeue(q)
-        print(f"Извлекли {item}: {queue_to_string(q)}")
-    
-    print("\n2. СТЕК (LIFO):")
-    s = create_stack()
-    print(f"Создан пустой стек: {stack_to_string(s)}")
-    
-    # Добавляем элементы
-    s = stack_push(s, 'X')
-    print(f"Добавили 'X': {stack_to_string(s)}")
-    s = stack_push(s, 'Y')
-    print(f"Добавили 'Y': {stack_to_string(s)}")
-    s = stack_push(s, 'Z')
-    print(f"Добавили 'Z': {stack_to_string(s)}")
-    
-    print(f"\nВерхний элемент (peek): {stack_peek(s)}")
-    print(f"Размер стека: {stack_size(s)}")
-    
-    # Извлекаем элементы
-    print("\nИзвлечение элементов:")
-    while not stack_is_empty(s):
-        item, s = stack_pop(s)
-        print(f"Извлекли '{item}': {stack_to_string(s)}")
-
-def compare_approaches() -> None:
-    """Сравнение двух подходов на одном примере"""
-    print_separator("СРАВНЕНИЕ ПОДХОДОВ")
-    
-    data = [1, 2, 3, 4, 5]
-    
-    print("Задача: добавить числа [1, 2, 3, 4, 5] и извлечь три элемента")
-    
-    # ООП подход
-    print("\n--- ООП подход ---")
-    oop_queue = Queue[int]()
-    for num in data:
-        oop_queue.enqueue(num)
-    print(f"После добавления всех чисел: {oop_queue}")
-    
-    results = []
-    for _ in range(3):
-        results.append(oop_queue.dequeue())
-    print(f"Извлекли три элемента: {results}")
-    print(f"Осталось в очереди: {oop_queue}")
-    
-    # Функциональный подход
-    print("\n--- Функциональный подход ---")
-    fp_queue = create_queue()
-    for num in data:
-        fp_queue = queue_enqueue(fp_queue, num)
-    print(f"После добавления всех чисел: {queue_to_string(fp_queue)}")
-    
-    results = []
-    current_queue = fp_queue
-    for _ in range(3):
-        item, current_queue = queue_dequeue(current_queue)
-        results.append(item)
-    print(f"Извлекли три элемента: {results}")
-    print(f"Осталось в очереди: {queue_to_string(current_queue)}")
-    
-    print("\n" + "-"*40)
-    print("КЛЮЧЕВЫЕ ОТЛИЧИЯ:")
-    print("-"*40)
-    print("1. ООП: методы работают с объектом (изменяют его состояние)")
-    print("2. ФП: функции возвращают новые структуры (старые не меняются)")
-    print("3. ООП: queue.enqueue(5) - добавляет в существующую очередь")
-    print("4. ФП: queue = queue_enqueue(queue, 5) - создает новую очередь")
-    print("5. ООП: естественная инкапсуляция (данные внутри объекта)")
-    print("6. ФП: данные явно передаются в функции")
-
-
-   
-
-def main() -> None:
-    """Главная функция программы"""
-    print("ЛАБОРАТОРНАЯ РАБОТА: РЕАЛИЗАЦИЯ QUEUE И STACK")
-    print("В ООП И ФУНКЦИОНАЛЬНОМ СТИЛЕ")
-    
-    demonstrate_oop()
-    demonstrate_functional()
-    compare_approaches()
-    
-    print_separator("ЗАВЕРШЕНИЕ")
-    print("Программа демонстрирует разницу между:")
-    print("1. ООП - с классами, методами и состоянием объектов")
-    print("2. Функциональным стилем - с функциями и иммутабельными данными")
-
-if __name__ == "__main__":
-    main()
+from typing import Generic, TypeVar, Optional, List, Dict, Tuple, Iterator, Iterable, MutableSequence, Union
+from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+import argparse
+import asyncio
+import bisect
+import concurrent.futures
+import functools
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import pickle
+import random
+import struct
+import sys
+import threading
+import time
+import tracemalloc
+
+T = TypeVar('T')
+
+# ==================== ООП РЕАЛИЗАЦИЯ ====================
+
+class _RingBuffer(Generic[T]):
+    """Растущий кольцевой буфер: амортизированное O(1) на обоих концах
+    
+    Ёмкость всегда степень двойки, поэтому индекс считается маской.
+    Буфер удваивается при заполнении и уменьшается вдвое, когда
+    заполнен меньше чем на четверть.
+    """
+    
+    __slots__ = ("_slots", "_head", "_count", "_mask")
+    
+    MIN_CAPACITY = 8
+    
+    def __init__(self, capacity: int = MIN_CAPACITY) -> None:
+        capacity = max(capacity, self.MIN_CAPACITY)
+        capacity = 1 << (capacity - 1).bit_length()
+        self._slots: List[Optional[T]] = [None] * capacity
+        self._head = 0
+        self._count = 0
+        self._mask = capacity - 1
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __iter__(self) -> Iterator[T]:
+        slots, mask = self._slots, self._mask
+        for i in range(self._count):
+            yield slots[(self._head + i) & mask]
+    
+    def capacity(self) -> int:
+        """Текущая ёмкость буфера"""
+        return len(self._slots)
+    
+    def append(self, item: T) -> None:
+        """Добавить элемент в хвост"""
+        if self._count == len(self._slots):
+            self._resize(len(self._slots) * 2)
+        self._slots[(self._head + self._count) & self._mask] = item
+        self._count += 1
+    
+    def appendleft(self, item: T) -> None:
+        """Добавить элемент в голову"""
+        if self._count == len(self._slots):
+            self._resize(len(self._slots) * 2)
+        self._head = (self._head - 1) & self._mask
+        self._slots[self._head] = item
+        self._count += 1
+    
+    def popleft(self) -> T:
+        """Удалить и вернуть элемент из головы (буфер не должен быть пуст)"""
+        head = self._head
+        item = self._slots[head]
+        self._slots[head] = None  # Не держим ссылку на извлечённый объект
+        self._head = (head + 1) & self._mask
+        self._count -= 1
+        if self._count <= len(self._slots) >> 2:
+            self._maybe_shrink()
+        return item
+    
+    def pop(self) -> T:
+        """Удалить и вернуть элемент из хвоста (буфер не должен быть пуст)"""
+        self._count -= 1
+        tail = (self._head + self._count) & self._mask
+        item = self._slots[tail]
+        self._slots[tail] = None
+        if self._count <= len(self._slots) >> 2:
+            self._maybe_shrink()
+        return item
+    
+    def popleft_many(self, n: int) -> List[T]:
+        """Удалить и вернуть до n элементов из головы одним срезом"""
+        n = min(n, self._count)
+        slots, head = self._slots, self._head
+        end = head + n
+        if end <= len(slots):
+            batch = slots[head:end]
+            slots[head:end] = [None] * n
+        else:
+            end -= len(slots)
+            batch = slots[head:] + slots[:end]
+            slots[head:] = [None] * (len(slots) - head)
+            slots[:end] = [None] * end
+        self._head = end & self._mask
+        self._count -= n
+        if self._count <= len(slots) >> 2:
+            self._maybe_shrink()
+        return batch
+    
+    def __getitem__(self, index: int) -> T:
+        """Элемент с номером index от головы (0 <= index < len)"""
+        return self._slots[(self._head + index) & self._mask]
+    
+    def __setitem__(self, index: int, item: T) -> None:
+        self._slots[(self._head + index) & self._mask] = item
+    
+    def clear(self) -> None:
+        """Удалить все элементы и вернуться к минимальной ёмкости"""
+        self._slots = [None] * self.MIN_CAPACITY
+        self._head = 0
+        self._count = 0
+        self._mask = self.MIN_CAPACITY - 1
+    
+    def first(self) -> T:
+        """Элемент в голове без удаления"""
+        return self._slots[self._head]
+    
+    def last(self) -> T:
+        """Элемент в хвосте без удаления"""
+        return self._slots[(self._head + self._count - 1) & self._mask]
+    
+    def _maybe_shrink(self) -> None:
+        # Сразу до наименьшей степени двойки не меньше 2 * count: пакетное
+        # извлечение может убрать почти всё за один вызов
+        capacity = len(self._slots)
+        if capacity > self.MIN_CAPACITY and self._count <= capacity >> 2:
+            self._resize(max(self.MIN_CAPACITY, 1 << (2 * self._count - 1).bit_length()))
+    
+    def _resize(self, capacity: int) -> None:
+        # Разворачиваем кольцо так, чтобы голова оказалась в начале
+        items = list(self)
+        self._slots = items + [None] * (capacity - len(items))
+        self._head = 0
+        self._mask = capacity - 1
+
+
+class _QueueItems(MutableSequence[T]):
+    """Изменяемое представление элементов очереди (Queue.items)
+    
+    Ведёт себя как список от первого элемента к последнему, но все
+    изменения сразу попадают в кольцевой буфер очереди. append, чтение
+    и запись по индексу и удаление первого элемента - O(1); sort,
+    reverse, insert и удаление из середины перестраивают буфер за O(n).
+    """
+    
+    __slots__ = ("_queue",)
+    __hash__ = None
+    
+    def __init__(self, queue: "Queue[T]") -> None:
+        self._queue = queue
+    
+    def __len__(self) -> int:
+        return len(self._queue._buffer)
+    
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._queue._buffer)
+    
+    def _index(self, index: int) -> int:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("Индекс вне диапазона")
+        return index
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        return self._queue._buffer[self._index(index)]
+    
+    def __setitem__(self, index, item) -> None:
+        if isinstance(index, slice):
+            items = list(self)
+            items[index] = item
+            self._queue._replace_items(items)
+        else:
+            self._queue._buffer[self._index(index)] = item
+    
+    def __delitem__(self, index) -> None:
+        if not isinstance(index, slice) and self._index(index) == 0:
+            self._queue.dequeue()
+            return
+        items = list(self)
+        del items[index]
+        self._queue._replace_items(items)
+    
+    def insert(self, index: int, item: T) -> None:
+        items = list(self)
+        items.insert(index, item)
+        self._queue._replace_items(items)
+    
+    def append(self, item: T) -> None:
+        self._queue.enqueue(item)
+    
+    def clear(self) -> None:
+        self._queue._replace_items([])
+    
+    def sort(self, *, key=None, reverse: bool = False) -> None:
+        items = list(self)
+        items.sort(key=key, reverse=reverse)
+        self._queue._replace_items(items)
+    
+    def reverse(self) -> None:
+        self._queue._replace_items(list(self)[::-1])
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, _QueueItems)):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class Queue(Generic[T]):
+    """Очередь FIFO (First-In-First-Out) - ООП стиль"""
+    
+    DRAIN_BATCH = 1024
+    
+    def __init__(self) -> None:
+        self._buffer: _RingBuffer[T] = _RingBuffer()
+    
+    @classmethod
+    def of(cls, typecode: str) -> "TypedQueue":
+        """Компактная очередь чисел с типом array.array ("q", "d", "i", ...)"""
+        return TypedQueue(typecode)
+    
+    @classmethod
+    def instrumented(cls, name: str = "queue") -> "InstrumentedQueue[T]":
+        """Очередь со сбором метрик (обычная Queue метрик не собирает)"""
+        return InstrumentedQueue(name)
+    
+    @property
+    def items(self) -> _QueueItems[T]:
+        """Элементы очереди от первого к последнему
+        
+        Изменяемое представление, а не копия: q.items.sort(),
+        q.items.append(x) и т.п. меняют саму очередь, как и раньше,
+        когда items был списком.
+        """
+        return _QueueItems(self)
+    
+    @items.setter
+    def items(self, items: Iterable[T]) -> None:
+        self._replace_items(list(items))
+    
+    def _replace_items(self, items: List[T]) -> None:
+        # Перестроить буфер целиком - для изменений через items
+        buffer = self._buffer
+        buffer.clear()
+        for item in items:
+            buffer.append(item)
+    
+    def enqueue(self, item: T) -> None:
+        """Добавить элемент в конец очереди"""
+        self._buffer.append(item)
+    
+    def dequeue(self) -> Optional[T]:
+        """Удалить и вернуть первый элемент"""
+        if len(self._buffer) == 0:
+            return None
+        return self._buffer.popleft()
+    
+    def peek(self) -> Optional[T]:
+        """Посмотреть первый элемент без удаления"""
+        if self.is_empty():
+            return None
+        return self._buffer.first()
+    
+    def is_empty(self) -> bool:
+        """Проверить, пуста ли очередь"""
+        return len(self._buffer) == 0
+    
+    def size(self) -> int:
+        """Получить размер очереди"""
+        return len(self._buffer)
+    
+    def dequeue_batch(self, n: int) -> List[T]:
+        """Удалить и вернуть до n первых элементов одним списком"""
+        if n < 0:
+            raise ValueError("Размер пачки не может быть отрицательным")
+        return self._buffer.popleft_many(n)
+    
+    def drain(self, max_items: Optional[int] = None) -> Iterator[T]:
+        """Извлекать элементы по мере обхода (не более max_items)
+        
+        Элементы извлекаются пачками до того, как выдаются, поэтому
+        size(), peek() и другие извлечения их уже не видят. Если обход
+        прерван (break, close()), невыданный остаток пачки возвращается
+        в начало очереди в прежнем порядке - ничего не теряется.
+        """
+        buffer = self._buffer
+        remaining = sys.maxsize if max_items is None else max_items
+        while remaining > 0 and len(buffer):
+            batch = buffer.popleft_many(min(remaining, self.DRAIN_BATCH))
+            taken = 0
+            try:
+                for item in batch:
+                    taken += 1
+                    yield item
+            finally:
+                for item in reversed(batch[taken:]):
+                    buffer.appendleft(item)
+            remaining -= taken
+    
+    def __iter__(self) -> Iterator[T]:
+        """Обход от первого элемента к последнему без удаления"""
+        return iter(self._buffer)
+    
+    def __len__(self) -> int:
+        return len(self._buffer)
+    
+    def __str__(self) -> str:
+        return f"Queue({self.items})"
+
+
+class Stack(Generic[T]):
+    """Стек LIFO (Last-In-First-Out) - ООП стиль"""
+    
+    def __init__(self) -> None:
+        self.items: List[T] = []
+    
+    @classmethod
+    def of(cls, typecode: str) -> "TypedStack":
+        """Компактный стек чисел с типом array.array ("q", "d", "i", ...)"""
+        return TypedStack(typecode)
+    
+    @classmethod
+    def instrumented(cls, name: str = "stack") -> "InstrumentedStack[T]":
+        """Стек со сбором метрик (обычный Stack метрик не собирает)"""
+        return InstrumentedStack(name)
+    
+    def push(self, item: T) -> None:
+        """Добавить элемент на вершину стека"""
+        self.items.append(item)
+    
+    def pop(self) -> Optional[T]:
+        """Удалить и вернуть верхний элемент"""
+        if self.is_empty():
+            return None
+        return self.items.pop()
+    
+    def peek(self) -> Optional[T]:
+        """Посмотреть верхний элемент без удаления"""
+        if self.is_empty():
+            return None
+        return self.items[-1]
+    
+    def is_empty(self) -> bool:
+        """Проверить, пуст ли стек"""
+        return len(self.items) == 0
+    
+    def size(self) -> int:
+        """Получить размер стека"""
+        return len(self.items)
+    
+    def pop_batch(self, n: int) -> List[T]:
+        """Удалить и вернуть до n верхних элементов (первым - верхний)"""
+        if n < 0:
+            raise ValueError("Размер пачки не может быть отрицательным")
+        if n == 0:
+            return []
+        batch = self.items[-n:]
+        del self.items[-n:]
+        batch.reverse()
+        return batch
+    
+    def drain(self, max_items: Optional[int] = None) -> Iterator[T]:
+        """Извлекать элементы с вершины по мере обхода (не более max_items)"""
+        items = self.items
+        remaining = sys.maxsize if max_items is None else max_items
+        while remaining > 0 and items:
+            yield items.pop()
+            remaining -= 1
+    
+    def __iter__(self) -> Iterator[T]:
+        """Обход от вершины ко дну без удаления"""
+        return reversed(self.items)
+    
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def __str__(self) -> str:
+        return f"Stack({self.items})"
+
+
+# ---------- Компактные типизированные варианты ----------
+
+class TypedQueue:
+    """Очередь FIFO чисел одного типа в непрерывном буфере array.array
+    
+    Элементы лежат подряд с позиции _head: dequeue только сдвигает её,
+    а освободившееся начало буфера удаляется одним сдвигом, когда оно
+    занимает больше половины (амортизированно O(1)).
+    """
+    
+    __slots__ = ("_items", "_head")
+    
+    COMPACT_THRESHOLD = 1024
+    
+    def __init__(self, typecode: str) -> None:
+        self._items = array(typecode)
+        self._head = 0
+    
+    @property
+    def typecode(self) -> str:
+        """Код типа элементов array.array"""
+        return self._items.typecode
+    
+    def enqueue(self, item) -> None:
+        """Добавить элемент в конец очереди"""
+        self._items.append(item)
+    
+    def dequeue(self):
+        """Удалить и вернуть первый элемент"""
+        head = self._head
+        if head == len(self._items):
+            return None
+        item = self._items[head]
+        head += 1
+        if head == len(self._items):
+            del self._items[:]
+            head = 0
+        elif head >= self.COMPACT_THRESHOLD and head * 2 >= len(self._items):
+            del self._items[:head]
+            head = 0
+        self._head = head
+        return item
+    
+    def peek(self):
+        """Посмотреть первый элемент без удаления"""
+        if self.is_empty():
+            return None
+        return self._items[self._head]
+    
+    def is_empty(self) -> bool:
+        """Проверить, пуста ли очередь"""
+        return self._head == len(self._items)
+    
+    def size(self) -> int:
+        """Получить размер очереди"""
+        return len(self._items) - self._head
+    
+    def view(self) -> memoryview:
+        """Представление элементов без копирования (буферный протокол)
+        
+        Пока представление не освобождено (release() или блок with),
+        очередь нельзя изменять - array запрещает менять размер буфера.
+        """
+        return memoryview(self._items)[self._head:]
+    
+    def __iter__(self) -> Iterator:
+        """Обход от первого элемента к последнему без удаления"""
+        return iter(self._items[self._head:])
+    
+    def __len__(self) -> int:
+        return len(self._items) - self._head
+    
+    def __str__(self) -> str:
+        return f"Queue({self._items[self._head:].tolist()})"
+
+
+class TypedStack:
+    """Стек LIFO чисел одного типа в непрерывном буфере array.array"""
+    
+    __slots__ = ("_items",)
+    
+    def __init__(self, typecode: str) -> None:
+        self._items = array(typecode)
+    
+    @property
+    def typecode(self) -> str:
+        """Код типа элементов array.array"""
+        return self._items.typecode
+    
+    def push(self, item) -> None:
+        """Добавить элемент на вершину стека"""
+        self._items.append(item)
+    
+    def pop(self):
+        """Удалить и вернуть верхний элемент"""
+        if self.is_empty():
+            return None
+        return self._items.pop()
+    
+    def peek(self):
+        """Посмотреть верхний элемент без удаления"""
+        if self.is_empty():
+            return None
+        return self._items[-1]
+    
+    def is_empty(self) -> bool:
+        """Проверить, пуст ли стек"""
+        return len(self._items) == 0
+    
+    def size(self) -> int:
+        """Получить размер стека"""
+        return len(self._items)
+    
+    def view(self) -> memoryview:
+        """Представление элементов от дна к вершине без копирования
+        
+        Пока представление не освобождено, стек нельзя изменять.
+        """
+        return memoryview(self._items)
+    
+    def __iter__(self) -> Iterator:
+        """Обход от вершины ко дну без удаления"""
+        return reversed(self._items)
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __str__(self) -> str:
+        return f"Stack({self._items.tolist()})"
+
+
+# ---------- Инструментирование ----------
+
+class ContainerMetrics:
+    """Метрики очереди или стека: глубина, пропускная способность, время ожидания
+    
+    Для каждого элемента хранится момент добавления (в том же порядке
+    извлечения, что и у самого контейнера), поэтому при извлечении
+    известно, сколько он пролежал. Времена ожидания собираются в
+    гистограмму с фиксированными границами (в секундах).
+    """
+    
+    BUCKETS = (0.000_001, 0.000_01, 0.000_1, 0.001, 0.01, 0.1, 1.0, 10.0, 60.0)
+    
+    def __init__(self, name: str, lifo: bool = False) -> None:
+        self.name = name
+        self.lifo = lifo
+        self.depth = 0
+        self.high_water = 0
+        self.added_total = 0
+        self.removed_total = 0
+        self._stamps: _RingBuffer[float] = _RingBuffer()
+        self._bucket_counts = [0] * (len(self.BUCKETS) + 1)
+        self.residence_seconds_sum = 0.0
+        self._last_time = time.monotonic()
+        self._last_added = 0
+        self._last_removed = 0
+    
+    def on_add(self, count: int = 1) -> None:
+        """Учесть добавление count элементов"""
+        now = time.monotonic()
+        for _ in range(count):
+            self._stamps.append(now)
+        self.added_total += count
+        self.depth += count
+        if self.depth > self.high_water:
+            self.high_water = self.depth
+    
+    def on_remove(self, count: int = 1) -> None:
+        """Учесть извлечение count элементов"""
+        now = time.monotonic()
+        take = self._stamps.pop if self.lifo else self._stamps.popleft
+        for _ in range(count):
+            residence = now - take()
+            self._bucket_counts[bisect.bisect_left(self.BUCKETS, residence)] += 1
+            self.residence_seconds_sum += residence
+        self.removed_total += count
+        self.depth -= count
+    
+    def snapshot(self) -> Dict[str, object]:
+        """Текущие значения метрик; скорости - с момента прошлого снимка"""
+        now = time.monotonic()
+        elapsed = max(now - self._last_time, 1e-9)
+        add_rate = (self.added_total - self._last_added) / elapsed
+        remove_rate = (self.removed_total - self._last_removed) / elapsed
+        self._last_time = now
+        self._last_added = self.added_total
+        self._last_removed = self.removed_total
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "high_water": self.high_water,
+            "added_total": self.added_total,
+            "removed_total": self.removed_total,
+            "add_rate": add_rate,
+            "remove_rate": remove_rate,
+            "residence_seconds": {
+                "count": self.removed_total,
+                "sum": self.residence_seconds_sum,
+                "buckets": self.residence_buckets(),
+            },
+        }
+    
+    def residence_buckets(self) -> Dict[str, int]:
+        """Накопленные счётчики гистограммы времени ожидания по границам"""
+        cumulative = 0
+        buckets: Dict[str, int] = {}
+        for bound, count in zip(self.BUCKETS + (float("inf"),), self._bucket_counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+        return buckets
+    
+    def to_prometheus(self) -> str:
+        """Метрики в текстовом формате Prometheus"""
+        return metrics_to_prometheus([self])
+
+
+def _prometheus_label(value: str) -> str:
+    """Экранировать значение метки: обратная косая черта, кавычка и перевод строки"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def metrics_to_prometheus(metrics: Iterable[ContainerMetrics]) -> str:
+    """Экспортировать метрики нескольких контейнеров в формате Prometheus
+    
+    Скорости не экспортируются - Prometheus вычисляет их по счётчикам.
+    """
+    metrics = list(metrics)
+    lines: List[str] = []
+    
+    def family(metric: str, kind: str, help_text: str, attribute: str) -> None:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for m in metrics:
+            lines.append(f'{metric}{{name="{_prometheus_label(m.name)}"}} {getattr(m, attribute)}')
+    
+    family("container_depth", "gauge", "Current number of items", "depth")
+    family("container_high_water", "gauge", "Maximum number of items seen", "high_water")
+    family("container_added_total", "counter", "Items added", "added_total")
+    family("container_removed_total", "counter", "Items removed", "removed_total")
+    
+    metric = "container_residence_seconds"
+    lines.append(f"# HELP {metric} Time items spent in the container")
+    lines.append(f"# TYPE {metric} histogram")
+    for m in metrics:
+        for bound, count in m.residence_buckets().items():
+            lines.append(f'{metric}_bucket{{name="{_prometheus_label(m.name)}",le="{bound}"}} {count}')
+        lines.append(f'{metric}_sum{{name="{_prometheus_label(m.name)}"}} {m.residence_seconds_sum}')
+        lines.append(f'{metric}_count{{name="{_prometheus_label(m.name)}"}} {m.removed_total}')
+    return "\n".join(lines) + "\n"
+
+
+class InstrumentedQueue(Queue[T]):
+    """Очередь FIFO, собирающая ContainerMetrics (см. Queue.instrumented)"""
+    
+    def __init__(self, name: str = "queue") -> None:
+        super().__init__()
+        self.metrics = ContainerMetrics(name)
+    
+    def enqueue(self, item: T) -> None:
+        super().enqueue(item)
+        self.metrics.on_add()
+    
+    def dequeue(self) -> Optional[T]:
+        if self.is_empty():
+            return None
+        item = super().dequeue()
+        self.metrics.on_remove()
+        return item
+    
+    def dequeue_batch(self, n: int) -> List[T]:
+        batch = super().dequeue_batch(n)
+        self.metrics.on_remove(len(batch))
+        return batch
+    
+    def _replace_items(self, items: List[T]) -> None:
+        change = len(items) - self.size()
+        super()._replace_items(items)
+        if change > 0:
+            self.metrics.on_add(change)
+        elif change < 0:
+            self.metrics.on_remove(-change)
+    
+    def drain(self, max_items: Optional[int] = None) -> Iterator[T]:
+        # По одному элементу, а не пачками Queue.drain: тогда depth
+        # совпадает с size() в любой момент обхода
+        remaining = sys.maxsize if max_items is None else max_items
+        while remaining > 0 and not self.is_empty():
+            yield self.dequeue()
+            remaining -= 1
+
+
+class InstrumentedStack(Stack[T]):
+    """Стек LIFO, собирающий ContainerMetrics (см. Stack.instrumented)"""
+    
+    def __init__(self, name: str = "stack") -> None:
+        super().__init__()
+        self.metrics = ContainerMetrics(name, lifo=True)
+    
+    def push(self, item: T) -> None:
+        super().push(item)
+        self.metrics.on_add()
+    
+    def pop(self) -> Optional[T]:
+        if self.is_empty():
+            return None
+        item = super().pop()
+        self.metrics.on_remove()
+        return item
+    
+    def pop_batch(self, n: int) -> List[T]:
+        batch = super().pop_batch(n)
+        self.metrics.on_remove(len(batch))
+        return batch
+    
+    def drain(self, max_items: Optional[int] = None) -> Iterator[T]:
+        for item in super().drain(max_items):
+            self.metrics.on_remove()
+            yield item
+
+
+# ---------- Очередь с приоритетом ----------
+
+class _HeapEntry(Generic[T]):
+    """Элемент двоичной кучи; служит дескриптором для decrease_key/remove"""
+    
+    __slots__ = ("priority", "order", "item", "index")
+    
+    def __init__(self, item: T, priority, order: int) -> None:
+        self.item = item
+        self.priority = priority
+        self.order = order  # Порядок добавления - для стабильности
+        self.index = -1  # Позиция в куче; -1 - элемент уже извлечён
+    
+    def _key(self) -> tuple:
+        return (self.priority, self.order)
+
+
+class PriorityQueue(Generic[T]):
+    """Очередь с приоритетом на двоичной куче - ООП стиль
+    
+    Первым извлекается элемент с наименьшим приоритетом, при равных
+    приоритетах - добавленный раньше. push возвращает дескриптор,
+    по которому элемент можно найти за O(1) для decrease_key/remove.
+    """
+    
+    def __init__(self, items: Iterable[Tuple[T, object]] = ()) -> None:
+        self._heap: List[_HeapEntry[T]] = []
+        self._counter = 0
+        for item, priority in items:
+            entry = _HeapEntry(item, priority, self._counter)
+            entry.index = len(self._heap)
+            self._heap.append(entry)
+            self._counter += 1
+        # Построение кучи снизу вверх за O(n)
+        for index in reversed(range(len(self._heap) // 2)):
+            self._sift_down(index)
+    
+    def push(self, item: T, priority) -> _HeapEntry[T]:
+        """Добавить элемент с приоритетом; вернуть дескриптор элемента"""
+        entry = _HeapEntry(item, priority, self._counter)
+        self._counter += 1
+        entry.index = len(self._heap)
+        self._heap.append(entry)
+        self._sift_up(entry.index)
+        return entry
+    
+    def pop(self) -> Optional[T]:
+        """Удалить и вернуть элемент с наименьшим приоритетом"""
+        if self.is_empty():
+            return None
+        return self._remove_at(0).item
+    
+    def peek(self) -> Optional[T]:
+        """Посмотреть элемент с наименьшим приоритетом без удаления"""
+        if self.is_empty():
+            return None
+        return self._heap[0].item
+    
+    def peek_priority(self):
+        """Наименьший приоритет в очереди (None, если очередь пуста)"""
+        if self.is_empty():
+            return None
+        return self._heap[0].priority
+    
+    def decrease_key(self, handle: _HeapEntry[T], priority) -> None:
+        """Уменьшить приоритет элемента по его дескриптору"""
+        self._check_handle(handle)
+        if priority > handle.priority:
+            raise ValueError("Новый приоритет больше текущего")
+        handle.priority = priority
+        self._sift_up(handle.index)
+    
+    def remove(self, handle: _HeapEntry[T]) -> T:
+        """Удалить элемент по его дескриптору и вернуть его"""
+        self._check_handle(handle)
+        return self._remove_at(handle.index).item
+    
+    def is_empty(self) -> bool:
+        """Проверить, пуста ли очередь"""
+        return len(self._heap) == 0
+    
+    def size(self) -> int:
+        """Получить размер очереди"""
+        return len(self._heap)
+    
+    def _check_handle(self, handle: _HeapEntry[T]) -> None:
+        index = handle.index
+        if index < 0 or index >= len(self._heap) or self._heap[index] is not handle:
+            raise ValueError("Элемент не находится в этой очереди")
+    
+    def _remove_at(self, index: int) -> _HeapEntry[T]:
+        heap = self._heap
+        entry = heap[index]
+        last = heap.pop()
+        if last is not entry:
+            heap[index] = last
+            last.index = index
+            self._sift_down(index)
+            self._sift_up(last.index)
+        entry.index = -1
+        return entry
+    
+    def _sift_up(self, index: int) -> None:
+        heap = self._heap
+        entry = heap[index]
+        key = entry._key()
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent = heap[parent_index]
+            if key >= parent._key():
+                break
+            heap[index] = parent
+            parent.index = index
+            index = parent_index
+        heap[index] = entry
+        entry.index = index
+    
+    def _sift_down(self, index: int) -> None:
+        heap = self._heap
+        size = len(heap)
+        entry = heap[index]
+        key = entry._key()
+        while True:
+            child_index = 2 * index + 1
+            if child_index >= size:
+                break
+            right_index = child_index + 1
+            if right_index < size and heap[right_index]._key() < heap[child_index]._key():
+                child_index = right_index
+            child = heap[child_index]
+            if key <= child._key():
+                break
+            heap[index] = child
+            child.index = index
+            index = child_index
+        heap[index] = entry
+        entry.index = index
+    
+    def __str__(self) -> str:
+        ordered = sorted(self._heap, key=_HeapEntry._key)
+        return f"PriorityQueue({[(entry.item, entry.priority) for entry in ordered]})"
+
+
+# ---------- Очередь с переносом на диск ----------
+
+class DurableQueue(Generic[T]):
+    """Очередь FIFO, которая держит в памяти только начало и конец
+    
+    Каждый элемент сериализуется (pickle) и дописывается в текущий
+    файл-сегмент журнала. В памяти остаются не более memory_items
+    элементов из начала очереди и столько же из её конца; середина
+    хранится только на диске и читается из сегментов через mmap.
+    Полностью прочитанные сегменты удаляются.
+    
+    Позиция чтения сохраняется в файл cursor при удалении сегмента,
+    через каждые checkpoint_every извлечений и при close(). При открытии
+    каталога непрочитанные элементы восстанавливаются с диска; после
+    аварийного завершения элементы, извлечённые после последнего
+    сохранения позиции, будут выданы повторно.
+    """
+    
+    _RECORD = struct.Struct("<I")
+    _CURSOR = struct.Struct("<QQ")
+    _SUFFIX = ".seg"
+    
+    def __init__(self, directory: str, segment_size: int = 16 * 1024 * 1024,
+                 memory_items: int = 10_000, checkpoint_every: int = 1_000,
+                 fsync: bool = False) -> None:
+        if segment_size <= 0 or memory_items <= 0 or checkpoint_every <= 0:
+            raise ValueError("Размеры должны быть положительными числами")
+        self.directory = directory
+        self.segment_size = segment_size
+        self.memory_items = memory_items
+        self.checkpoint_every = checkpoint_every
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+        
+        # Начало и конец очереди: (элемент, позиция после его записи)
+        self._head: Queue[Tuple[T, Tuple[int, int]]] = Queue()
+        self._tail: Queue[Tuple[T, Tuple[int, int]]] = Queue()
+        self._middle = 0  # Сколько элементов сейчас только на диске
+        self._since_checkpoint = 0
+        self._recover()
+    
+    # ---- Файлы сегментов и курсор ----
+    
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"{number:012d}{self._SUFFIX}")
+    
+    def _cursor_path(self) -> str:
+        return os.path.join(self.directory, "cursor")
+    
+    def _segment_numbers(self) -> List[int]:
+        return sorted(int(name[:-len(self._SUFFIX)]) for name in os.listdir(self.directory)
+                      if name.endswith(self._SUFFIX))
+    
+    def checkpoint(self) -> None:
+        """Сохранить позицию чтения на диск"""
+        temp_path = self._cursor_path() + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(self._CURSOR.pack(*self._read_pos))
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, self._cursor_path())
+        self._since_checkpoint = 0
+    
+    def _recover(self) -> None:
+        """Восстановить состояние очереди по файлам каталога"""
+        numbers = self._segment_numbers()
+        read_pos = (numbers[0] if numbers else 0, 0)
+        if os.path.exists(self._cursor_path()):
+            with open(self._cursor_path(), "rb") as f:
+                saved = self._CURSOR.unpack(f.read(self._CURSOR.size))
+            if not numbers or saved[0] >= numbers[0]:
+                read_pos = saved
+        # Сегменты до курсора уже прочитаны - удаление могло не успеть
+        for number in numbers:
+            if number < read_pos[0]:
+                os.remove(self._segment_path(number))
+        numbers = [number for number in numbers if number >= read_pos[0]]
+        
+        # Считаем непрочитанные записи; недописанную последнюю запись отрезаем
+        count = 0
+        for number in numbers:
+            offset = read_pos[1] if number == read_pos[0] else 0
+            path = self._segment_path(number)
+            size = os.path.getsize(path)
+            with open(path, "rb") as f:
+                while offset + self._RECORD.size <= size:
+                    f.seek(offset)
+                    (length,) = self._RECORD.unpack(f.read(self._RECORD.size))
+                    if offset + self._RECORD.size + length > size:
+                        break
+                    offset += self._RECORD.size + length
+                    count += 1
+            if offset < size:
+                os.truncate(path, offset)
+        
+        self._read_pos = read_pos
+        self._fetch_pos = read_pos
+        self._middle = count
+        self._size = count
+        self._first_segment = numbers[0] if numbers else read_pos[0]
+        self._write_segment = numbers[-1] if numbers else read_pos[0]
+        self._writer = open(self._segment_path(self._write_segment), "ab", buffering=0)
+        self._write_offset = self._writer.tell()
+    
+    # ---- Запись и чтение ----
+    
+    def enqueue(self, item: T) -> None:
+        """Добавить элемент в конец очереди"""
+        payload = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        record = self._RECORD.pack(len(payload)) + payload
+        if self._write_offset > 0 and self._write_offset + len(record) > self.segment_size:
+            self._writer.close()
+            self._write_segment += 1
+            self._writer = open(self._segment_path(self._write_segment), "ab", buffering=0)
+            self._write_offset = 0
+        # Небуферизованная запись сразу попадает в ОС и переживает падение процесса
+        self._writer.write(record)
+        if self.fsync:
+            os.fsync(self._writer.fileno())
+        self._write_offset += len(record)
+        end = (self._write_segment, self._write_offset)
+        self._size += 1
+        
+        if self._middle == 0 and self._tail.is_empty() and self._head.size() < self.memory_items:
+            self._head.enqueue((item, end))
+            self._fetch_pos = end
+        else:
+            self._tail.enqueue((item, end))
+            if self._tail.size() > self.memory_items:
+                # Самый старый элемент конца остаётся только на диске
+                self._tail.dequeue()
+                self._middle += 1
+    
+    def _refill(self) -> None:
+        """Загрузить следующую порцию элементов в начало очереди"""
+        if self._middle > 0:
+            count = min(self._middle, self.memory_items)
+            for item, end in self._read_records(self._fetch_pos, count):
+                self._head.enqueue((item, end))
+                self._fetch_pos = end
+            self._middle -= count
+        else:
+            while not self._tail.is_empty() and self._head.size() < self.memory_items:
+                item, end = self._tail.dequeue()
+                self._head.enqueue((item, end))
+                self._fetch_pos = end
+    
+    def _read_records(self, position: Tuple[int, int], count: int) -> List[Tuple[T, Tuple[int, int]]]:
+        """Прочитать count записей с диска, начиная с position"""
+        segment, offset = position
+        records: List[Tuple[T, Tuple[int, int]]] = []
+        while len(records) < count:
+            with open(self._segment_path(segment), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if offset >= size:
+                    segment, offset = segment + 1, 0
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    while len(records) < count and offset < size:
+                        (length,) = self._RECORD.unpack_from(mapped, offset)
+                        start = offset + self._RECORD.size
+                        offset = start + length
+                        records.append((pickle.loads(mapped[start:offset]), (segment, offset)))
+        return records
+    
+    def dequeue(self) -> Optional[T]:
+        """Удалить и вернуть первый элемент"""
+        if self._head.is_empty():
+            self._refill()
+            if self._head.is_empty():
+                return None
+        item, end = self._head.dequeue()
+        self._read_pos = end
+        self._size -= 1
+        self._since_checkpoint += 1
+        if end[0] > self._first_segment:
+            # Все сегменты до текущего прочитаны полностью
+            self.checkpoint()
+            while self._first_segment < end[0]:
+                os.remove(self._segment_path(self._first_segment))
+                self._first_segment += 1
+        elif self._since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+        return item
+    
+    def peek(self) -> Optional[T]:
+        """Посмотреть первый элемент без удаления"""
+        if self._head.is_empty():
+            self._refill()
+            if self._head.is_empty():
+                return None
+        return self._head.peek()[0]
+    
+    def is_empty(self) -> bool:
+        """Проверить, пуста ли очередь"""
+        return self._size == 0
+    
+    def size(self) -> int:
+        """Получить размер очереди"""
+        return self._size
+    
+    def close(self) -> None:
+        """Сохранить позицию чтения и закрыть файл журнала"""
+        if not self._writer.closed:
+            self.checkpoint()
+            self._writer.close()
+    
+    def __enter__(self) -> "DurableQueue[T]":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def __str__(self) -> str:
+        return f"DurableQueue({self.directory!r}, size={self._size})"
+
+
+# ---------- Двусторонняя очередь из блоков ----------
+
+class _ChunkNode(Generic[T]):
+    """Узел декартова дерева (treap) блоков; size - число элементов в поддереве"""
+    
+    __slots__ = ("chunk", "size", "priority", "left", "right")
+    
+    def __init__(self, chunk: List[T]) -> None:
+        self.chunk = chunk
+        self.size = len(chunk)
+        self.priority = random.random()
+        self.left: Optional["_ChunkNode[T]"] = None
+        self.right: Optional["_ChunkNode[T]"] = None
+
+
+def _chunk_size(node: Optional[_ChunkNode[T]]) -> int:
+    return 0 if node is None else node.size
+
+def _chunk_update(node: _ChunkNode[T]) -> _ChunkNode[T]:
+    node.size = len(node.chunk) + _chunk_size(node.left) + _chunk_size(node.right)
+    return node
+
+def _chunk_join(a: Optional[_ChunkNode[T]], b: Optional[_ChunkNode[T]]) -> Optional[_ChunkNode[T]]:
+    """Соединить деревья: все блоки a идут перед блоками b (O(log n))"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.priority > b.priority:
+        a.right = _chunk_join(a.right, b)
+        return _chunk_update(a)
+    b.left = _chunk_join(a, b.left)
+    return _chunk_update(b)
+
+def _chunk_split(node: Optional[_ChunkNode[T]], count: int
+                 ) -> Tuple[Optional[_ChunkNode[T]], Optional[_ChunkNode[T]]]:
+    """Разрезать дерево: первые count элементов - влево (O(log n))"""
+    if node is None:
+        return None, None
+    left_size = _chunk_size(node.left)
+    if count <= left_size:
+        left, node.left = _chunk_split(node.left, count)
+        return left, _chunk_update(node)
+    count -= left_size
+    if count >= len(node.chunk):
+        node.right, right = _chunk_split(node.right, count - len(node.chunk))
+        return _chunk_update(node), right
+    # Разрез проходит внутри блока - делим его на два узла
+    left_part = _chunk_join(node.left, _ChunkNode(node.chunk[:count]))
+    right_part = _chunk_join(_ChunkNode(node.chunk[count:]), node.right)
+    return left_part, right_part
+
+def _chunk_pop_first(node: _ChunkNode[T]) -> Tuple[Optional[_ChunkNode[T]], _ChunkNode[T]]:
+    """Отделить самый левый блок; вернуть (остаток дерева, блок)"""
+    if node.left is None:
+        rest, node.right = node.right, None
+        return rest, _chunk_update(node)
+    node.left, first = _chunk_pop_first(node.left)
+    return _chunk_update(node), first
+
+def _chunk_pop_last(node: _ChunkNode[T]) -> Tuple[Optional[_ChunkNode[T]], _ChunkNode[T]]:
+    """Отделить самый правый блок; вернуть (остаток дерева, блок)"""
+    if node.right is None:
+        rest, node.left = node.left, None
+        return rest, _chunk_update(node)
+    node.right, last = _chunk_pop_last(node.right)
+    return _chunk_update(node), last
+
+def _chunk_glue(a: Optional[_ChunkNode[T]], b: Optional[_ChunkNode[T]],
+                limit: int) -> Optional[_ChunkNode[T]]:
+    """Соединить деревья, слив граничные блоки, если вместе они не длиннее limit
+    
+    Сохраняет инвариант: любые два соседних блока вместе длиннее limit,
+    поэтому блоков не больше 2n/limit + 1 (O(log n)).
+    """
+    if a is None or b is None:
+        return _chunk_join(a, b)
+    a, last = _chunk_pop_last(a)
+    b, first = _chunk_pop_first(b)
+    if len(last.chunk) + len(first.chunk) <= limit:
+        last.chunk.extend(first.chunk)
+        return _chunk_join(a, _chunk_join(_chunk_update(last), b))
+    return _chunk_join(_chunk_join(a, last), _chunk_join(first, b))
+
+
+class Deque(Generic[T]):
+    """Двусторонняя очередь из блоков фиксированного размера
+    
+    Элементы середины лежат в блоках (списках до CHUNK элементов),
+    упорядоченных декартовым деревом с размерами поддеревьев - оно
+    служит индексом блоков. Крайние элементы копятся в двух буферах,
+    поэтому push/pop с обоих концов - амортизированно O(1), доступ по
+    индексу, split и concat - O(log n). Неполные блоки на стыках,
+    которые оставляют split и concat, сливаются с соседними.
+    """
+    
+    CHUNK = 256
+    
+    def __init__(self, items: Iterable[T] = ()) -> None:
+        self._front: List[T] = []  # Начало очереди в обратном порядке
+        self._root: Optional[_ChunkNode[T]] = None
+        self._back: List[T] = []
+        self.extend(items)
+    
+    # ---- Концы ----
+    
+    def push_back(self, item: T) -> None:
+        """Добавить элемент в конец"""
+        self._back.append(item)
+        if len(self._back) >= self.CHUNK:
+            self._root = _chunk_join(self._root, _ChunkNode(self._back))
+            self._back = []
+    
+    def push_front(self, item: T) -> None:
+        """Добавить элемент в начало"""
+        self._front.append(item)
+        if len(self._front) >= self.CHUNK:
+            self._front.reverse()
+            self._root = _chunk_join(_ChunkNode(self._front), self._root)
+            self._front = []
+    
+    def pop_back(self) -> Optional[T]:
+        """Удалить и вернуть последний элемент"""
+        if not self._back:
+            if self._root is not None:
+                self._root, last = _chunk_pop_last(self._root)
+                self._back = last.chunk
+            elif self._front:
+                return self._front.pop(0)
+            else:
+                return None
+        return self._back.pop()
+    
+    def pop_front(self) -> Optional[T]:
+        """Удалить и вернуть первый элемент"""
+        if not self._front:
+            if self._root is not None:
+                self._root, first = _chunk_pop_first(self._root)
+                first.chunk.reverse()
+                self._front = first.chunk
+            elif self._back:
+                return self._back.pop(0)
+            else:
+                return None
+        return self._front.pop()
+    
+    def peek_front(self) -> Optional[T]:
+        """Посмотреть первый элемент без удаления"""
+        return None if self.is_empty() else self[0]
+    
+    def peek_back(self) -> Optional[T]:
+        """Посмотреть последний элемент без удаления"""
+        return None if self.is_empty() else self[-1]
+    
+    def extend(self, items: Iterable[T]) -> None:
+        """Добавить элементы в конец по порядку"""
+        for item in items:
+            self.push_back(item)
+    
+    # ---- Размер и доступ по индексу ----
+    
+    def __len__(self) -> int:
+        return len(self._front) + _chunk_size(self._root) + len(self._back)
+    
+    def is_empty(self) -> bool:
+        """Проверить, пуста ли очередь"""
+        return len(self) == 0
+    
+    def size(self) -> int:
+        """Получить размер очереди"""
+        return len(self)
+    
+    def _locate(self, index: int) -> Tuple[List[T], int]:
+        """Найти список и позицию в нём для элемента с индексом index"""
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("Индекс вне диапазона")
+        if index < len(self._front):
+            return self._front, len(self._front) - 1 - index
+        index -= len(self._front)
+        node = self._root
+        if index >= _chunk_size(node):
+            return self._back, index - _chunk_size(node)
+        while True:
+            left_size = _chunk_size(node.left)
+            if index < left_size:
+                node = node.left
+                continue
+            index -= left_size
+            if index < len(node.chunk):
+                return node.chunk, index
+            index -= len(node.chunk)
+            node = node.right
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return Deque(self[i] for i in range(start, stop, step))
+            return Deque(self._iter_range(start, stop))
+        items, position = self._locate(index)
+        return items[position]
+    
+    def __setitem__(self, index: int, item: T) -> None:
+        items, position = self._locate(index)
+        items[position] = item
+    
+    def _chunks_from(self, index: int) -> Iterator[Tuple[List[T], int]]:
+        """Блоки дерева по порядку, начиная с блока, где лежит элемент index
+        
+        Выдаёт пары (блок, позиция первого нужного элемента в блоке).
+        """
+        path: List[_ChunkNode[T]] = []  # Предки, в которых спуск шёл влево
+        node = self._root
+        while True:
+            left_size = _chunk_size(node.left)
+            if index < left_size:
+                path.append(node)
+                node = node.left
+            elif index < left_size + len(node.chunk):
+                break
+            else:
+                index -= left_size + len(node.chunk)
+                node = node.right
+        yield node.chunk, index - left_size
+        node = node.right
+        while True:
+            while node is not None:
+                path.append(node)
+                node = node.left
+            if not path:
+                return
+            node = path.pop()
+            yield node.chunk, 0
+            node = node.right
+    
+    def _iter_range(self, start: int, stop: int) -> Iterator[T]:
+        """Элементы с индексами [start, stop) без прохода по началу очереди"""
+        front_size = len(self._front)
+        position = start
+        while position < min(stop, front_size):
+            yield self._front[front_size - 1 - position]
+            position += 1
+        tree_size = _chunk_size(self._root)
+        if position < stop and position - front_size < tree_size:
+            for chunk, offset in self._chunks_from(position - front_size):
+                piece = chunk[offset:offset + stop - position]
+                yield from piece
+                position += len(piece)
+                if position >= stop:
+                    return
+        back_start = front_size + tree_size
+        yield from self._back[max(0, position - back_start):max(0, stop - back_start)]
+    
+    def __iter__(self) -> Iterator[T]:
+        return self._iter_range(0, len(self))
+    
+    # ---- Разрезание и соединение ----
+    
+    def _flush(self) -> None:
+        """Перенести буферы концов в дерево блоков"""
+        if self._front:
+            self._front.reverse()
+            self._root = _chunk_glue(_ChunkNode(self._front), self._root, self.CHUNK)
+            self._front = []
+        if self._back:
+            self._root = _chunk_glue(self._root, _ChunkNode(self._back), self.CHUNK)
+            self._back = []
+    
+    def split(self, index: int) -> "Deque[T]":
+        """Оставить элементы [0, index), а [index, len) вернуть новой очередью (O(log n))"""
+        if not 0 <= index <= len(self):
+            raise IndexError("Индекс вне диапазона")
+        self._flush()
+        tail: Deque[T] = Deque()
+        left, right = _chunk_split(self._root, index)
+        # Разрез внутри блока оставляет по куску на каждой стороне -
+        # сливаем их с соседями
+        if left is not None:
+            left, last = _chunk_pop_last(left)
+            left = _chunk_glue(left, last, self.CHUNK)
+        if right is not None:
+            right, first = _chunk_pop_first(right)
+            right = _chunk_glue(first, right, self.CHUNK)
+        self._root, tail._root = left, right
+        return tail
+    
+    def concat(self, other: "Deque[T]") -> None:
+        """Дописать в конец все элементы other за O(log n); other становится пустой"""
+        if other is self:
+            raise ValueError("Нельзя присоединить очередь к самой себе")
+        self._flush()
+        other._flush()
+        self._root = _chunk_glue(self._root, other._root, self.CHUNK)
+        other._root = None
+    
+    def __str__(self) -> str:
+        return f"Deque({list(self)})"
+
+
+# ---------- Потокобезопасные ограниченные варианты ----------
+
+class _BlockingContainer(ABC, Generic[T]):
+    """Общая часть потокобезопасных контейнеров с ограниченной ёмкостью
+    
+    Одна блокировка и два условия: потребители ждут на not_empty,
+    производители - на not_full. put_many/get_many переносят целую
+    пачку элементов за один захват блокировки.
+    """
+    
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        if capacity is not None and capacity <= 0:
+            raise ValueError("Ёмкость должна быть положительным числом")
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+    
+    # Операции над внутренним хранилищем (вызываются под блокировкой)
+    @abstractmethod
+    def _push(self, item: T) -> None: ...
+    
+    @abstractmethod
+    def _pop(self) -> T: ...
+    
+    @abstractmethod
+    def _peek(self) -> Optional[T]: ...
+    
+    @abstractmethod
+    def _size(self) -> int: ...
+    
+    def _free(self) -> int:
+        if self.capacity is None:
+            return sys.maxsize
+        return self.capacity - self._size()
+    
+    def put(self, item: T, timeout: Optional[float] = None) -> bool:
+        """Добавить элемент, ожидая свободного места; False - по таймауту"""
+        with self._lock:
+            if not self._not_full.wait_for(lambda: self._free() > 0, timeout):
+                return False
+            self._push(item)
+            self._not_empty.notify()
+            return True
+    
+    def put_many(self, items: List[T], timeout: Optional[float] = None) -> int:
+        """Добавить элементы пачками; вернуть, сколько удалось добавить"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        added = 0
+        with self._lock:
+            while added < len(items):
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if not self._not_full.wait_for(lambda: self._free() > 0, remaining):
+                    break
+                batch = min(self._free(), len(items) - added)
+                for item in items[added:added + batch]:
+                    self._push(item)
+                added += batch
+                self._not_empty.notify(batch)
+        return added
+    
+    def get(self, timeout: Optional[float] = None) -> Optional[T]:
+        """Извлечь элемент, ожидая его появления; None - по таймауту"""
+        with self._lock:
+            if not self._not_empty.wait_for(lambda: self._size() > 0, timeout):
+                return None
+            item = self._pop()
+            self._not_full.notify()
+            return item
+    
+    def get_many(self, max_items: int, timeout: Optional[float] = None) -> List[T]:
+        """Дождаться хотя бы одного элемента и забрать до max_items за раз"""
+        if max_items <= 0:
+            raise ValueError("max_items должен быть положительным числом")
+        with self._lock:
+            if not self._not_empty.wait_for(lambda: self._size() > 0, timeout):
+                return []
+            batch = [self._pop() for _ in range(min(max_items, self._size()))]
+            self._not_full.notify(len(batch))
+            return batch
+    
+    def peek(self) -> Optional[T]:
+        """Посмотреть следующий извлекаемый элемент без удаления"""
+        with self._lock:
+            return self._peek()
+    
+    def is_empty(self) -> bool:
+        """Проверить, пуст ли контейнер"""
+        with self._lock:
+            return self._size() == 0
+    
+    def is_full(self) -> bool:
+        """Проверить, достигнута ли ёмкость"""
+        with self._lock:
+            return self._free() <= 0
+    
+    def size(self) -> int:
+        """Получить число элементов"""
+        with self._lock:
+            return self._size()
+
+
+class BlockingQueue(_BlockingContainer[T]):
+    """Потокобезопасная ограниченная очередь FIFO с блокирующими put/get"""
+    
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        super().__init__(capacity)
+        self._items: Queue[T] = Queue()
+    
+    def _push(self, item: T) -> None:
+        self._items.enqueue(item)
+    
+    def _pop(self) -> T:
+        return self._items.dequeue()
+    
+    def _peek(self) -> Optional[T]:
+        return self._items.peek()
+    
+    def _size(self) -> int:
+        return self._items.size()
+    
+    def __str__(self) -> str:
+        with self._lock:
+            return f"BlockingQueue({self._items.items})"
+
+
+class BlockingStack(_BlockingContainer[T]):
+    """Потокобезопасный ограниченный стек LIFO с блокирующими put/get"""
+    
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        super().__init__(capacity)
+        self._items: Stack[T] = Stack()
+    
+    def _push(self, item: T) -> None:
+        self._items.push(item)
+    
+    def _pop(self) -> T:
+        return self._items.pop()
+    
+    def _peek(self) -> Optional[T]:
+        return self._items.peek()
+    
+    def _size(self) -> int:
+        return self._items.size()
+    
+    def __str__(self) -> str:
+        with self._lock:
+            return f"BlockingStack({self._items.items})"
+
+
+# ---------- Варианты для asyncio ----------
+
+class _AsyncContainer(ABC, Generic[T]):
+    """Общая часть контейнеров для asyncio с ограниченной ёмкостью
+    
+    Ожидающие корутины хранятся в очередях future-объектов и будятся
+    по одной на каждый освободившийся слот или добавленный элемент.
+    Если ожидающего отменили уже после пробуждения, пробуждение
+    передаётся следующему, чтобы элемент не "потерялся".
+    """
+    
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        if capacity is not None and capacity <= 0:
+            raise ValueError("Ёмкость должна быть положительным числом")
+        self.capacity = capacity
+        self._getters: deque = deque()
+        self._putters: deque = deque()
+    
+    # Операции над внутренним хранилищем
+    @abstractmethod
+    def _push(self, item: T) -> None: ...
+    
+    @abstractmethod
+    def _pop(self) -> T: ...
+    
+    @abstractmethod
+    def _peek(self) -> Optional[T]: ...
+    
+    @abstractmethod
+    def _size(self) -> int: ...
+    
+    @staticmethod
+    def _wakeup_next(waiters: deque) -> None:
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+    
+    async def _wait(self, waiters: deque, blocked) -> None:
+        """Ждать, пока blocked() истинно; корректно обрабатывает отмену"""
+        while blocked():
+            waiter = asyncio.get_running_loop().create_future()
+            waiters.append(waiter)
+            try:
+                await waiter
+            except BaseException:
+                waiter.cancel()
+                try:
+                    waiters.remove(waiter)
+                except ValueError:
+                    pass
+                if not blocked() and not waiter.cancelled():
+                    self._wakeup_next(waiters)
+                raise
+    
+    async def put(self, item: T) -> None:
+        """Добавить элемент; при заполненном контейнере - приостановиться"""
+        await self._wait(self._putters, self.is_full)
+        self._push(item)
+        self._wakeup_next(self._getters)
+    
+    def put_nowait(self, item: T) -> bool:
+        """Добавить элемент без ожидания; False, если места нет"""
+        if self.is_full():
+            return False
+        self._push(item)
+        self._wakeup_next(self._getters)
+        return True
+    
+    async def get(self) -> T:
+        """Извлечь элемент; при пустом контейнере - приостановиться"""
+        await self._wait(self._getters, self.is_empty)
+        item = self._pop()
+        self._wakeup_next(self._putters)
+        return item
+    
+    def get_nowait(self) -> Optional[T]:
+        """Извлечь элемент без ожидания; None, если контейнер пуст"""
+        if self.is_empty():
+            return None
+        item = self._pop()
+        self._wakeup_next(self._putters)
+        return item
+    
+    async def get_batch(self, n: int, timeout: Optional[float] = None) -> List[T]:
+        """Дождаться хотя бы одного элемента (не дольше timeout) и забрать до n"""
+        if n <= 0:
+            raise ValueError("Размер пачки должен быть положительным числом")
+        if self.is_empty():
+            try:
+                await asyncio.wait_for(self._wait(self._getters, self.is_empty), timeout)
+            except asyncio.TimeoutError:
+                return []
+        batch = [self._pop() for _ in range(min(n, self._size()))]
+        for _ in batch:
+            self._wakeup_next(self._putters)
+        return batch
+    
+    def peek(self) -> Optional[T]:
+        """Посмотреть следующий извлекаемый элемент без удаления"""
+        return self._peek()
+    
+    def is_empty(self) -> bool:
+        """Проверить, пуст ли контейнер"""
+        return self._size() == 0
+    
+    def is_full(self) -> bool:
+        """Проверить, достигнута ли ёмкость"""
+        return self.capacity is not None and self._size() >= self.capacity
+    
+    def size(self) -> int:
+        """Получить число элементов"""
+        return self._size()
+
+
+class AsyncQueue(_AsyncContainer[T]):
+    """Очередь FIFO для asyncio с ожиданием вместо опроса is_empty()"""
+    
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        super().__init__(capacity)
+        self._items: Queue[T] = Queue()
+    
+    def _push(self, item: T) -> None:
+        self._items.enqueue(item)
+    
+    def _pop(self) -> T:
+        return self._items.dequeue()
+    
+    def _peek(self) -> Optional[T]:
+        return self._items.peek()
+    
+    def _size(self) -> int:
+        return self._items.size()
+    
+    def __str__(self) -> str:
+        return f"AsyncQueue({self._items.items})"
+
+
+class AsyncStack(_AsyncContainer[T]):
+    """Стек LIFO для asyncio с ожиданием вместо опроса is_empty()"""
+    
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        super().__init__(capacity)
+        self._items: Stack[T] = Stack()
+    
+    def _push(self, item: T) -> None:
+        self._items.push(item)
+    
+    def _pop(self) -> T:
+        return self._items.pop()
+    
+    def _peek(self) -> Optional[T]:
+        return self._items.peek()
+    
+    def _size(self) -> int:
+        return self._items.size()
+    
+    def __str__(self) -> str:
+        return f"AsyncStack({self._items.items})"
+
+
+# ---------- Очередь с задержкой на иерархическом колесе таймеров ----------
+
+class _Timer(Generic[T]):
+    """Отложенный элемент; служит дескриптором для DelayQueue.cancel"""
+    
+    __slots__ = ("item", "due", "level", "slot", "state")
+    
+    PENDING, FIRED, CANCELLED = 0, 1, 2
+    
+    def __init__(self, item: T, due: int) -> None:
+        self.item = item
+        self.due = due  # Номер тика, начиная с которого элемент готов
+        self.level = 0
+        self.slot: Optional[Dict["_Timer[T]", None]] = None
+        self.state = self.PENDING
+
+
+class DelayQueue(Generic[T]):
+    """Очередь, выдающая элементы только после наступления их срока
+    
+    Сроки хранятся в иерархическом колесе таймеров: LEVELS колёс по
+    WHEEL_SIZE ячеек, ячейка уровня k покрывает WHEEL_SIZE**k тиков.
+    Таймер кладётся в ячейку самого младшего уровня, в окно которого
+    попадает его срок, и при повороте старшего колеса переносится
+    ниже. Добавление и отмена - O(1); пустые участки времени
+    пропускаются целиком, без перебора тиков и таймеров.
+    
+    Срок округляется вверх до тика: элемент никогда не выдаётся раньше
+    срока и опаздывает не более чем на tick секунд.
+    """
+    
+    WHEEL_BITS = 6
+    WHEEL_SIZE = 1 << WHEEL_BITS
+    LEVELS = 4
+    
+    def __init__(self, tick: float = 0.001, clock=time.monotonic) -> None:
+        if tick <= 0:
+            raise ValueError("Длительность тика должна быть положительной")
+        self.tick = tick
+        self._clock = clock
+        self._origin = clock()
+        self._current = 0  # Все тики до текущего включительно обработаны
+        self._wheels = [[{} for _ in range(self.WHEEL_SIZE)] for _ in range(self.LEVELS)]
+        self._overflow: Dict[_Timer[T], None] = {}  # Сроки дальше старшего колеса
+        self._counts = [0] * (self.LEVELS + 1)
+        self._ready: Queue[_Timer[T]] = Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._async_waiters: set = set()
+    
+    # ---- Колесо таймеров (вызывается под блокировкой) ----
+    
+    def _tick_of(self, when: float) -> int:
+        return math.ceil((when - self._origin) / self.tick)
+    
+    def _time_of(self, tick: int) -> float:
+        return self._origin + tick * self.tick
+    
+    def _place(self, timer: _Timer[T]) -> None:
+        due, current = timer.due, self._current
+        if due <= current:
+            timer.slot = None
+            self._ready.enqueue(timer)
+            return
+        for level in range(self.LEVELS):
+            shift = self.WHEEL_BITS * (level + 1)
+            if due >> shift == current >> shift:
+                slot = self._wheels[level][(due >> (self.WHEEL_BITS * level)) & (self.WHEEL_SIZE - 1)]
+                break
+        else:
+            level, slot = self.LEVELS, self._overflow
+        slot[timer] = None
+        timer.slot = slot
+        timer.level = level
+        self._counts[level] += 1
+    
+    def _step(self) -> None:
+        """Повернуть колёса на один тик"""
+        self._current += 1
+        current = self._current
+        # Сначала переносим таймеры со старших уровней, затем с младших
+        for level in range(self.LEVELS, 0, -1):
+            if current & ((1 << (self.WHEEL_BITS * level)) - 1):
+                continue
+            if level == self.LEVELS:
+                slot = self._overflow
+            else:
+                slot = self._wheels[level][(current >> (self.WHEEL_BITS * level)) & (self.WHEEL_SIZE - 1)]
+            if slot:
+                timers = list(slot)
+                slot.clear()
+                self._counts[level] -= len(timers)
+                for timer in timers:
+                    self._place(timer)
+        slot = self._wheels[0][current & (self.WHEEL_SIZE - 1)]
+        if slot:
+            self._counts[0] -= len(slot)
+            for timer in slot:
+                timer.slot = None
+                self._ready.enqueue(timer)
+            slot.clear()
+    
+    def _advance(self, target: int) -> None:
+        """Довести колёса до тика target, пропуская пустые промежутки"""
+        while self._current < target:
+            lowest = next((level for level, count in enumerate(self._counts) if count), None)
+            if lowest is None:
+                self._current = target
+                return
+            if lowest > 0:
+                # Младшие колёса пусты: до поворота уровня lowest событий нет
+                span = 1 << (self.WHEEL_BITS * lowest)
+                boundary = (self._current // span + 1) * span
+                if boundary > target:
+                    self._current = target
+                    return
+                self._current = boundary - 1
+            self._step()
+    
+    def _next_tick(self) -> Optional[int]:
+        """Ближайший тик, когда стоит проверить очередь (None - таймеров нет)"""
+        lowest = next((level for level, count in enumerate(self._counts) if count), None)
+        if lowest is None:
+            return None
+        current = self._current
+        if lowest == 0:
+            base = current & ~(self.WHEEL_SIZE - 1)
+            for position in range((current & (self.WHEEL_SIZE - 1)) + 1, self.WHEEL_SIZE):
+                if self._wheels[0][position]:
+                    return base + position
+        span = 1 << (self.WHEEL_BITS * max(lowest, 1))
+        return (current // span + 1) * span
+    
+    def _pop_ready(self):
+        while not self._ready.is_empty():
+            timer = self._ready.dequeue()
+            if timer.state == _Timer.PENDING:
+                timer.state = _Timer.FIRED
+                self._pending -= 1
+                return timer
+        return None
+    
+    def _poll(self) -> Tuple[Optional[_Timer[T]], Optional[float]]:
+        """Выдать готовый таймер или вернуть, сколько секунд ждать следующего"""
+        self._advance(math.floor((self._clock() - self._origin) / self.tick))
+        timer = self._pop_ready()
+        if timer is not None:
+            return timer, 0.0
+        next_tick = self._next_tick()
+        if next_tick is None:
+            return None, None
+        return None, max(0.0, self._time_of(next_tick) - self._clock())
+    
+    # ---- Публичный интерфейс ----
+    
+    def enqueue(self, item: T, delay: float) -> _Timer[T]:
+        """Добавить элемент, который станет доступен через delay секунд"""
+        return self.enqueue_at(item, self._clock() + delay)
+    
+    def enqueue_at(self, item: T, when: float) -> _Timer[T]:
+        """Добавить элемент, который станет доступен в момент when (по часам очереди)"""
+        timer = _Timer(item, self._tick_of(when))
+        with self._lock:
+            self._place(timer)
+            self._pending += 1
+            self._changed.notify()
+            for loop, future in self._async_waiters:
+                loop.call_soon_threadsafe(self._wake, future)
+        return timer
+    
+    def cancel(self, timer: _Timer[T]) -> bool:
+        """Отменить элемент; False, если он уже выдан или отменён"""
+        with self._lock:
+            if timer.state != _Timer.PENDING:
+                return False
+            timer.state = _Timer.CANCELLED
+            self._pending -= 1
+            if timer.slot is not None:
+                del timer.slot[timer]
+                self._counts[timer.level] -= 1
+                timer.slot = None
+            return True
+    
+    def dequeue(self) -> Optional[T]:
+        """Вернуть элемент, срок которого наступил, или None без ожидания"""
+        with self._lock:
+            timer, _ = self._poll()
+        return None if timer is None else timer.item
+    
+    def get(self, timeout: Optional[float] = None) -> Optional[T]:
+        """Дождаться элемента со наступившим сроком; None - по таймауту"""
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._lock:
+            while True:
+                timer, wait = self._poll()
+                if timer is not None:
+                    return timer.item
+                if deadline is not None:
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        return None
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._changed.wait(wait)
+    
+    async def get_async(self, timeout: Optional[float] = None) -> Optional[T]:
+        """Асинхронно дождаться элемента со наступившим сроком; None - по таймауту"""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            future = loop.create_future()
+            waiter = (loop, future)
+            with self._lock:
+                timer, wait = self._poll()
+                if timer is not None:
+                    return timer.item
+                # Регистрируемся под той же блокировкой, чтобы не пропустить enqueue
+                self._async_waiters.add(waiter)
+            if deadline is not None:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    with self._lock:
+                        self._async_waiters.discard(waiter)
+                    return None
+                wait = remaining if wait is None else min(wait, remaining)
+            try:
+                await asyncio.wait({future}, timeout=wait)
+            finally:
+                with self._lock:
+                    self._async_waiters.discard(waiter)
+    
+    @staticmethod
+    def _wake(future) -> None:
+        if not future.done():
+            future.set_result(None)
+    
+    def is_empty(self) -> bool:
+        """Проверить, есть ли ожидающие или готовые элементы"""
+        with self._lock:
+            return self._pending == 0
+    
+    def size(self) -> int:
+        """Число элементов, ещё не выданных и не отменённых"""
+        with self._lock:
+            return self._pending
+
+
+# ---------- Очередь, разбитая на шарды ----------
+
+class _Shard(Generic[T]):
+    """Один шард ShardedQueue: очередь со своей блокировкой"""
+    
+    __slots__ = ("items", "lock", "not_empty", "retired", "stolen")
+    
+    def __init__(self) -> None:
+        self.items: Queue[T] = Queue()
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.retired = False  # Шард заменён при изменении числа шардов
+        self.stolen = 0  # Сколько элементов забрали потребители других шардов
+
+
+class ShardedQueue(Generic[T]):
+    """Очередь из нескольких независимых шардов для многих потоков
+    
+    Элемент попадает в шард по хэшу key(item), поэтому элементы с
+    одним ключом лежат в одном шарде и извлекаются в порядке
+    добавления. Каждый потребитель закреплён за своим шардом и
+    конкурирует только с его производителями; простаивающий
+    потребитель может забрать пачку из самого загруженного чужого шарда.
+    """
+    
+    STEAL_POLL = 0.01
+    
+    def __init__(self, shards: int, key=None) -> None:
+        if shards <= 0:
+            raise ValueError("Число шардов должно быть положительным")
+        self._key = key if key is not None else (lambda item: item)
+        self._shards: List[_Shard[T]] = [_Shard() for _ in range(shards)]
+        self._resize_lock = threading.Lock()
+    
+    @property
+    def shard_count(self) -> int:
+        """Текущее число шардов"""
+        return len(self._shards)
+    
+    def shard_of(self, item: T) -> int:
+        """Номер шарда, в который попадёт элемент"""
+        return hash(self._key(item)) % len(self._shards)
+    
+    def put(self, item: T) -> None:
+        """Добавить элемент в его шард"""
+        while True:
+            shards = self._shards
+            shard = shards[hash(self._key(item)) % len(shards)]
+            with shard.lock:
+                if shard.retired:
+                    continue  # Шарды сменились - пересчитываем
+                shard.items.enqueue(item)
+                shard.not_empty.notify()
+                return
+    
+    def put_many(self, items: Iterable[T]) -> None:
+        """Добавить элементы, захватывая блокировку каждого шарда один раз"""
+        # Все элементы одного ключа попадают в одну группу, поэтому их
+        # порядок сохраняется, даже если группу придётся повторить
+        pending = list(items)
+        while pending:
+            shards = self._shards
+            groups: Dict[int, List[T]] = {}
+            for item in pending:
+                groups.setdefault(hash(self._key(item)) % len(shards), []).append(item)
+            pending = []
+            for index, group in groups.items():
+                shard = shards[index]
+                with shard.lock:
+                    if shard.retired:
+                        pending.extend(group)
+                        continue
+                    for item in group:
+                        shard.items.enqueue(item)
+                    shard.not_empty.notify(len(group))
+    
+    def _take(self, shard: _Shard[T], max_items: int) -> List[T]:
+        # Вызывается под блокировкой шарда
+        return shard.items.dequeue_batch(max_items)
+    
+    def _steal(self, own_index: int, max_items: int) -> List[T]:
+        """Забрать пачку из самого загруженного чужого шарда"""
+        shards = self._shards
+        own_index %= len(shards)
+        victims = sorted((shard.items.size(), index) for index, shard in enumerate(shards)
+                         if index != own_index)
+        for depth, index in reversed(victims):
+            if depth == 0:
+                break
+            victim = shards[index]
+            with victim.lock:
+                if victim.retired:
+                    continue
+                batch = self._take(victim, max_items)
+                if batch:
+                    victim.stolen += len(batch)
+                    return batch
+        return []
+    
+    def get_batch(self, shard_index: int, max_items: int, timeout: Optional[float] = None,
+                  steal: bool = True) -> List[T]:
+        """Забрать до max_items из своего шарда, а если он пуст - из чужого
+        
+        Ждёт не дольше timeout; пустой список - по таймауту. Номер
+        шарда берётся по модулю текущего числа шардов на каждом круге
+        ожидания: после resize потребитель (в том числе уже ждущий)
+        закрепляется за шардом shard_index % shard_count.
+        """
+        if max_items <= 0:
+            raise ValueError("max_items должен быть положительным числом")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            shards = self._shards
+            shard = shards[shard_index % len(shards)]
+            with shard.lock:
+                if not shard.retired:
+                    batch = self._take(shard, max_items)
+                    if batch:
+                        return batch
+            if steal:
+                batch = self._steal(shard_index, max_items)
+                if batch:
+                    return batch
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return []
+            # Новые элементы в чужих шардах нас не будят - при перехвате ждём коротко
+            wait = self.STEAL_POLL if steal else remaining
+            if wait is not None and remaining is not None:
+                wait = min(wait, remaining)
+            with shard.lock:
+                if shard.items.is_empty() and not shard.retired:
+                    shard.not_empty.wait(wait)
+    
+    def get(self, shard_index: int, timeout: Optional[float] = None, steal: bool = True) -> Optional[T]:
+        """Извлечь один элемент для потребителя шарда shard_index; None - по таймауту"""
+        batch = self.get_batch(shard_index, 1, timeout, steal)
+        return batch[0] if batch else None
+    
+    def resize(self, shards: int) -> None:
+        """Изменить число шардов, перераспределив элементы по новым хэшам
+        
+        Элементы одного ключа переезжают вместе и в прежнем порядке.
+        """
+        if shards <= 0:
+            raise ValueError("Число шардов должно быть положительным")
+        with self._resize_lock:
+            old = self._shards
+            for shard in old:
+                shard.lock.acquire()
+            try:
+                new: List[_Shard[T]] = [_Shard() for _ in range(shards)]
+                for shard in old:
+                    for item in shard.items.drain():
+                        new[hash(self._key(item)) % shards].items.enqueue(item)
+                    shard.retired = True
+                self._shards = new
+                for shard in old:
+                    shard.not_empty.notify_all()
+            finally:
+                for shard in old:
+                    shard.lock.release()
+    
+    def depths(self) -> List[int]:
+        """Глубина каждого шарда"""
+        return [shard.items.size() for shard in self._shards]
+    
+    def stats(self) -> Dict[str, object]:
+        """Статистика по шардам: глубины и число перехваченных элементов"""
+        depths = self.depths()
+        return {
+            "shards": len(depths),
+            "depths": depths,
+            "stolen": [shard.stolen for shard in self._shards],
+            "total": sum(depths),
+            "max_depth": max(depths),
+        }
+    
+    def size(self) -> int:
+        """Общее число элементов"""
+        return sum(self.depths())
+    
+    def is_empty(self) -> bool:
+        """Проверить, пусты ли все шарды"""
+        return self.size() == 0
+
+
+# ---------- Межпроцессная очередь в разделяемой памяти ----------
+
+class SharedQueue:
+    """Очередь FIFO между процессами на кольцевом буфере в shared memory
+    
+    Элементы хранятся в слотах фиксированного размера, описанных
+    форматом struct: "q" (int64), "d" (float64) или "<N>s" (байты длины N,
+    короткие значения дополняются нулями). Элементы не сериализуются
+    через pickle - они упаковываются прямо в общую память.
+    
+    В заголовке буфера лежат два монотонных счётчика: сколько элементов
+    извлечено (head) и сколько добавлено (tail). Доступ к ним защищён
+    межпроцессной блокировкой, ожидание - через Condition.
+    
+    Очередь передаётся дочерним процессам при их создании (аргументы
+    Process или initargs пула процессов). Удаляет разделяемую память
+    только close() в процессе-создателе (сверяется pid), поэтому
+    дочерний процесс, полученный через fork, может закрыть свою копию
+    первым.
+    """
+    
+    _HEADER = struct.Struct("<qq")
+    
+    def __init__(self, capacity: int, item_format: str = "q", context=None) -> None:
+        if capacity <= 0:
+            raise ValueError("Ёмкость должна быть положительным числом")
+        if item_format not in ("q", "d") and not (item_format[:-1].isdigit() and item_format.endswith("s")):
+            raise ValueError("Формат элемента должен быть 'q', 'd' или '<N>s'")
+        self.capacity = capacity
+        self.item_format = item_format
+        self._item_size = struct.calcsize("<" + item_format)
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=self._HEADER.size + capacity * self._item_size)
+        self._HEADER.pack_into(self._shm.buf, 0, 0, 0)
+        context = context or multiprocessing.get_context()
+        self._lock = context.Lock()
+        self._not_empty = context.Condition(self._lock)
+        self._not_full = context.Condition(self._lock)
+        self._owner_pid = os.getpid()
+    
+    def __getstate__(self) -> Dict[str, object]:
+        state = self.__dict__.copy()
+        state["_shm"] = self._shm.name
+        state["_owner_pid"] = None
+        return state
+    
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        self.__dict__.update(state)
+        self._shm = shared_memory.SharedMemory(name=state["_shm"])
+    
+    def _batch_format(self, count: int) -> str:
+        if self.item_format in ("q", "d"):
+            return f"<{count}{self.item_format}"
+        return "<" + self.item_format * count
+    
+    def _counters(self) -> Tuple[int, int]:
+        return self._HEADER.unpack_from(self._shm.buf, 0)
+    
+    def _size(self) -> int:
+        head, tail = self._counters()
+        return tail - head
+    
+    def _write(self, tail: int, items: List) -> None:
+        """Записать элементы в слоты, начиная с позиции tail (с переходом через край)"""
+        start = tail % self.capacity
+        first = min(len(items), self.capacity - start)
+        buf = self._shm.buf
+        base = self._HEADER.size
+        struct.pack_into(self._batch_format(first), buf, base + start * self._item_size, *items[:first])
+        if first < len(items):
+            struct.pack_into(self._batch_format(len(items) - first), buf, base, *items[first:])
+    
+    def _read(self, head: int, count: int) -> List:
+        """Прочитать count элементов, начиная с позиции head"""
+        start = head % self.capacity
+        first = min(count, self.capacity - start)
+        buf = self._shm.buf
+        base = self._HEADER.size
+        items = list(struct.unpack_from(self._batch_format(first), buf, base + start * self._item_size))
+        if first < count:
+            items.extend(struct.unpack_from(self._batch_format(count - first), buf, base))
+        return items
+    
+    def put(self, item, timeout: Optional[float] = None) -> bool:
+        """Добавить элемент, ожидая свободного места; False - по таймауту"""
+        return self.put_many([item], timeout) == 1
+    
+    def put_many(self, items: List, timeout: Optional[float] = None) -> int:
+        """Добавить элементы пачками; вернуть, сколько удалось добавить"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        added = 0
+        with self._lock:
+            while added < len(items):
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if not self._not_full.wait_for(lambda: self._size() < self.capacity, remaining):
+                    break
+                head, tail = self._counters()
+                batch = min(self.capacity - (tail - head), len(items) - added)
+                self._write(tail, items[added:added + batch])
+                self._HEADER.pack_into(self._shm.buf, 0, head, tail + batch)
+                added += batch
+                self._not_empty.notify(batch)
+        return added
+    
+    def get(self, timeout: Optional[float] = None):
+        """Извлечь элемент, ожидая его появления; None - по таймауту"""
+        batch = self.get_many(1, timeout)
+        return batch[0] if batch else None
+    
+    def get_many(self, max_items: int, timeout: Optional[float] = None) -> List:
+        """Дождаться хотя бы одного элемента и забрать до max_items за раз"""
+        if max_items <= 0:
+            raise ValueError("max_items должен быть положительным числом")
+        with self._lock:
+            if not self._not_empty.wait_for(lambda: self._size() > 0, timeout):
+                return []
+            head, tail = self._counters()
+            count = min(max_items, tail - head)
+            items = self._read(head, count)
+            self._HEADER.pack_into(self._shm.buf, 0, head + count, tail)
+            self._not_full.notify(count)
+            return items
+    
+    def is_empty(self) -> bool:
+        """Проверить, пуста ли очередь"""
+        with self._lock:
+            return self._size() == 0
+    
+    def size(self) -> int:
+        """Получить размер очереди"""
+        with self._lock:
+            return self._size()
+    
+    def close(self) -> None:
+        """Отключиться от разделяемой памяти; процесс-создатель также удаляет её"""
+        self._shm.close()
+        if self._owner_pid == os.getpid():
+            self._shm.unlink()
+    
+    def __enter__(self) -> "SharedQueue":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ---------- Планировщик с перехватом работы ----------
+
+class _WorkDeque(Generic[T]):
+    """Локальная дека задач потока-исполнителя
+    
+    Владелец работает с ней как со стеком (push/pop с конца - свежие
+    задачи, данные которых ещё в кэше), а другие потоки забирают
+    задачи с начала - самые старые и обычно самые крупные.
+    """
+    
+    __slots__ = ("_items", "_lock")
+    
+    def __init__(self) -> None:
+        self._items: _RingBuffer[T] = _RingBuffer()
+        self._lock = threading.Lock()
+    
+    def push(self, item: T) -> None:
+        with self._lock:
+            self._items.append(item)
+    
+    def pop(self) -> Optional[T]:
+        with self._lock:
+            if len(self._items) == 0:
+                return None
+            return self._items.pop()
+    
+    def steal(self) -> Optional[T]:
+        with self._lock:
+            if len(self._items) == 0:
+                return None
+            return self._items.popleft()
+    
+    def size(self) -> int:
+        return len(self._items)
+
+
+class WorkStealingExecutor(Executor):
+    """Пул потоков, в котором у каждого исполнителя своя дека задач
+    
+    Задачи, отправленные изнутри задачи, попадают в деку текущего
+    исполнителя; внешние задачи раскладываются по декам по кругу.
+    Освободившийся исполнитель перехватывает задачи с начала чужих дек.
+    Чтобы рекурсивная задача не простаивала, ожидая подзадачи, она
+    вызывает join(future) - пока результата нет, поток выполняет
+    другие задачи.
+    """
+    
+    def __init__(self, workers: Optional[int] = None) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        if self.workers <= 0:
+            raise ValueError("Число исполнителей должно быть положительным")
+        self._deques: List[_WorkDeque] = [_WorkDeque() for _ in range(self.workers)]
+        self._executed = [0] * self.workers
+        self._steals = [0] * self.workers
+        self._local = threading.local()
+        self._idle = threading.Condition()
+        self._sleeping = 0
+        self._next_deque = 0
+        self._shutdown = False
+        self._threads = [threading.Thread(target=self._worker, args=(index,), daemon=True)
+                         for index in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Запланировать вызов fn(*args, **kwargs) и вернуть Future"""
+        if self._shutdown:
+            raise RuntimeError("Пул уже остановлен")
+        future: Future = Future()
+        index = getattr(self._local, "index", None)
+        if index is None:
+            index = self._next_deque
+            self._next_deque = (index + 1) % self.workers
+        self._deques[index].push((fn, args, kwargs, future))
+        if self._sleeping:
+            with self._idle:
+                self._idle.notify()
+        return future
+    
+    def map(self, fn, *iterables, timeout: Optional[float] = None, chunksize: int = 1):
+        """Аналог Executor.map, безопасный для вызова изнутри задач"""
+        futures = [self.submit(fn, *args) for args in zip(*iterables)]
+        return iter([self.join(future, timeout) for future in futures])
+    
+    def join(self, future: Future, timeout: Optional[float] = None):
+        """Дождаться результата; поток-исполнитель тем временем выполняет другие задачи"""
+        index = getattr(self._local, "index", None)
+        if index is None:
+            return future.result(timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not future.done():
+            task = self._find_task(index)
+            if task is not None:
+                self._run(index, task)
+            elif deadline is not None and time.monotonic() >= deadline:
+                break
+            else:
+                concurrent.futures.wait([future], timeout=0.001)
+        return future.result(0 if deadline is not None else None)
+    
+    def _find_task(self, index: int):
+        task = self._deques[index].pop()
+        if task is not None:
+            return task
+        # Обходим чужие деки со случайного места, чтобы воры не толпились
+        offset = random.randrange(self.workers)
+        for step in range(self.workers):
+            victim = (offset + step) % self.workers
+            if victim != index and self._deques[victim].size():
+                task = self._deques[victim].steal()
+                if task is not None:
+                    self._steals[index] += 1
+                    return task
+        return None
+    
+    def _run(self, index: int, task) -> None:
+        fn, args, kwargs, future = task
+        self._executed[index] += 1
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as error:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def _worker(self, index: int) -> None:
+        self._local.index = index
+        while True:
+            task = self._find_task(index)
+            if task is not None:
+                self._run(index, task)
+                continue
+            with self._idle:
+                if self._shutdown:
+                    return
+                # Короткий таймаут страхует от пропущенного пробуждения
+                self._sleeping += 1
+                self._idle.wait(0.01)
+                self._sleeping -= 1
+    
+    def stats(self) -> Dict[str, object]:
+        """Статистика: сколько задач выполнил и перехватил каждый исполнитель"""
+        return {
+            "workers": self.workers,
+            "executed": list(self._executed),
+            "steals": list(self._steals),
+            "total_steals": sum(self._steals),
+            "queued": [deque_.size() for deque_ in self._deques],
+        }
+    
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Остановить пул после выполнения уже запланированных задач"""
+        if cancel_futures:
+            for work_deque in self._deques:
+                while (task := work_deque.steal()) is not None:
+                    task[3].cancel()
+        with self._idle:
+            self._shutdown = True
+            self._idle.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+# ==================== ФУНКЦИОНАЛЬНАЯ РЕАЛИЗАЦИЯ ====================
+
+class _Cons(Generic[T]):
+    """Неизменяемая ячейка односвязного списка (cons-ячейка)
+    
+    Версии структур разделяют общие хвосты, поэтому ячейки никогда
+    не изменяются после создания. Длина списка кэшируется в ячейке.
+    """
+    
+    __slots__ = ("head", "tail", "length")
+    
+    def __init__(self, head: T, tail: Optional["_Cons[T]"] = None) -> None:
+        self.head = head
+        self.tail = tail
+        self.length = 1 if tail is None else tail.length + 1
+
+
+def _cons_length(cell: Optional[_Cons[T]]) -> int:
+    """Длина cons-списка за O(1)"""
+    return 0 if cell is None else cell.length
+
+def _cons_reverse(cell: Optional[_Cons[T]]) -> Optional[_Cons[T]]:
+    """Развернуть cons-список (создаёт новые ячейки, исходный не меняется)"""
+    result: Optional[_Cons[T]] = None
+    while cell is not None:
+        result = _Cons(cell.head, result)
+        cell = cell.tail
+    return result
+
+def _cons_to_list(cell: Optional[_Cons[T]]) -> List[T]:
+    """Элементы cons-списка от головы к хвосту"""
+    result: List[T] = []
+    while cell is not None:
+        result.append(cell.head)
+        cell = cell.tail
+    return result
+
+
+class _Stream(Generic[T]):
+    """Ленивая неизменяемая ячейка (поток)
+    
+    Хвост вычисляется функцией при первом обращении и запоминается,
+    поэтому все версии, разделяющие ячейку, платят за него один раз.
+    Снаружи ведёт себя как _Cons: head, tail и длина.
+    """
+    
+    __slots__ = ("head", "length", "_tail", "_suspension")
+    
+    def __init__(self, head: T, length: int, tail: Optional["_Stream[T]"] = None,
+                 suspension=None) -> None:
+        self.head = head
+        self.length = length
+        self._tail = tail
+        self._suspension = suspension
+    
+    @property
+    def tail(self) -> Optional["_Stream[T]"]:
+        suspension = self._suspension
+        if suspension is not None:
+            self._tail = suspension()
+            self._suspension = None
+        return self._tail
+
+
+def _rotate(front: Optional[_Stream[T]], rear: Optional[_Cons[T]],
+            acc: Optional[_Stream[T]] = None) -> Optional[_Stream[T]]:
+    """Ленивый поток front ++ reverse(rear) ++ acc (требует len(rear) > len(front))
+    
+    За каждый шаг по front переносится один элемент rear, так что к
+    моменту, когда front кончается, разворачивать остаётся немного.
+    """
+    if front is None:
+        while rear is not None:
+            acc = _Stream(rear.head, _cons_length(acc) + 1, acc)
+            rear = rear.tail
+        return acc
+    length = front.length + rear.length + _cons_length(acc)
+    return _Stream(front.head, length, suspension=lambda: _rotate(
+        front.tail, rear.tail, _Stream(rear.head, _cons_length(acc) + 1, acc)))
+
+
+class _LazyStream(Generic[T]):
+    """Поток, который целиком вычисляется при первом обращении
+    
+    Результат запоминается, поэтому разворот, отложенный при заморозке
+    построителя, выполняется один раз на все версии очереди.
+    """
+    
+    __slots__ = ("length", "_compute", "_stream")
+    
+    def __init__(self, length: int, compute) -> None:
+        self.length = length
+        self._compute = compute
+        self._stream: Optional[_Stream[T]] = None
+    
+    def force(self) -> Optional[_Stream[T]]:
+        compute = self._compute
+        if compute is not None:
+            self._stream = compute()
+            self._compute = None
+        return self._stream
+
+
+def _force(front: Union[_Stream[T], _LazyStream[T], None]) -> Optional[_Stream[T]]:
+    """Начало очереди как поток: отложенный поток вычисляется (один раз)"""
+    return front.force() if type(front) is _LazyStream else front
+
+
+# Типы данных для функционального стиля
+QueueDict = Dict[str, Union[_Stream[T], _LazyStream[T], _Cons[T], None]]
+StackDict = Dict[str, Optional[_Cons[T]]]
+
+# ---------- Функции для работы с очередью ----------
+
+# Очередь Окасаки (banker's queue): "front" - ленивый поток с началом
+# очереди, "rear" - конец очереди в обратном порядке. Инвариант:
+# len(rear) <= len(front). Как только rear становится длиннее, front
+# заменяется ленивым front ++ reverse(rear); шаги этого потока
+# вычисляются по мере извлечения и запоминаются в общих ячейках, поэтому
+# операции - амортизированно O(1) даже при работе со многими старыми
+# версиями одновременно. Версии никогда не изменяются. Если front пуст,
+# а rear длиннее одного элемента (заморозка построителя,
+# queue_enqueue_many), разворот целиком откладывается в _LazyStream.
+
+def create_queue() -> QueueDict[T]:
+    """Создать новую пустую очередь - функциональный стиль"""
+    return {"front": None, "rear": None}
+
+def _queue_make(front: Union[_Stream[T], _LazyStream[T], None],
+                rear: Optional[_Cons[T]]) -> QueueDict[T]:
+    """Собрать версию очереди, восстановив инвариант len(rear) <= len(front) за O(1)"""
+    if _cons_length(rear) > _cons_length(front):
+        if front is None and rear.tail is not None:
+            front = _LazyStream(rear.length, functools.partial(_rotate, None, rear))
+        else:
+            front = _rotate(_force(front), rear)
+        rear = None
+    return {"front": front, "rear": rear}
+
+def queue_enqueue(queue: QueueDict[T], item: T) -> QueueDict[T]:
+    """Добавить элемент в конец очереди"""
+    return _queue_make(queue["front"], _Cons(item, queue["rear"]))
+
+def queue_dequeue(queue: QueueDict[T]) -> Tuple[Optional[T], QueueDict[T]]:
+    """Удалить и вернуть первый элемент из очереди"""
+    front = _force(queue["front"])
+    if front is None:
+        return None, queue
+    
+    return front.head, _queue_make(front.tail, queue["rear"])
+
+def queue_peek(queue: QueueDict[T]) -> Optional[T]:
+    """Посмотреть первый элемент без удаления"""
+    front = _force(queue["front"])
+    if front is None:
+        return None
+    return front.head
+
+def queue_is_empty(queue: QueueDict[T]) -> bool:
+    """Проверить, пуста ли очередь"""
+    return queue["front"] is None and queue["rear"] is None
+
+def queue_size(queue: QueueDict[T]) -> int:
+    """Получить размер очереди"""
+    return _cons_length(queue["front"]) + _cons_length(queue["rear"])
+
+def queue_items(queue: QueueDict[T]) -> List[T]:
+    """Элементы очереди от первого к последнему"""
+    items = _cons_to_list(_force(queue["front"]))
+    items.extend(reversed(_cons_to_list(queue["rear"])))
+    return items
+
+def queue_to_string(queue: QueueDict[T]) -> str:
+    """Представить очередь в виде строки"""
+    return f"Queue({queue_items(queue)})"
+
+def queue_enqueue_many(queue: QueueDict[T], items: Iterable[T]) -> QueueDict[T]:
+    """Добавить все элементы в конец очереди, создав одну новую версию"""
+    rear = queue["rear"]
+    for item in items:
+        rear = _Cons(item, rear)
+    return _queue_make(queue["front"], rear)
+
+
+class QueueTransient(Generic[T]):
+    """Изменяемый построитель очереди (transient)
+    
+    Изменяется на месте, не создавая словарь на каждую операцию, и
+    за O(1) замораживается в новую неизменяемую очередь методом
+    persistent(): развернуть добавленное придётся только при первом
+    извлечении.
+    Исходная очередь при этом не меняется - ячейки по-прежнему общие.
+    """
+    
+    __slots__ = ("_front", "_rear", "_frozen")
+    
+    def __init__(self, queue: QueueDict[T]) -> None:
+        self._front = queue["front"]
+        self._rear = queue["rear"]
+        self._frozen: Optional[QueueDict[T]] = None
+    
+    def _check(self) -> None:
+        if self._frozen is not None:
+            raise RuntimeError("Построитель уже заморожен")
+    
+    def enqueue(self, item: T) -> None:
+        """Добавить элемент в конец очереди"""
+        self._check()
+        self._rear = _Cons(item, self._rear)
+    
+    def dequeue(self) -> Optional[T]:
+        """Удалить и вернуть первый элемент"""
+        self._check()
+        front = self._take_front()
+        if front is None:
+            return None
+        self._front = front.tail
+        return front.head
+    
+    def peek(self) -> Optional[T]:
+        """Посмотреть первый элемент без удаления"""
+        self._check()
+        front = self._take_front()
+        return None if front is None else front.head
+    
+    def _take_front(self):
+        # Начало очереди для извлечения: отложенный поток вычисляется,
+        # пустое начало заменяется развёрнутым концом
+        self._front = _force(self._front)
+        if self._front is None:
+            self._front, self._rear = _cons_reverse(self._rear), None
+        return self._front
+    
+    def size(self) -> int:
+        """Получить размер очереди"""
+        return _cons_length(self._front) + _cons_length(self._rear)
+    
+    def persistent(self) -> QueueDict[T]:
+        """Заморозить построитель и вернуть неизменяемую очередь"""
+        if self._frozen is None:
+            self._frozen = _queue_make(self._front, self._rear)
+        return self._frozen
+
+
+@contextmanager
+def queue_transient(queue: QueueDict[T]) -> Iterator[QueueTransient[T]]:
+    """Построитель очереди на время блока with; результат - t.persistent()"""
+    transient = QueueTransient(queue)
+    yield transient
+    transient.persistent()
+
+# ---------- Функции для работы со стеком ----------
+
+# Стек - cons-список: "top" указывает на вершину. push добавляет ячейку
+# перед вершиной, pop возвращает её хвост, поэтому все версии стека
+# разделяют общую "нижнюю" часть, а размер берётся из ячейки.
+
+def create_stack() -> StackDict[T]:
+    """Создать новый пустой стек - функциональный стиль"""
+    return {"top": None}
+
+def stack_push(stack: StackDict[T], item: T) -> StackDict[T]:
+    """Добавить элемент на вершину стека"""
+    return {"top": _Cons(item, stack["top"])}
+
+def stack_pop(stack: StackDict[T]) -> Tuple[Optional[T], StackDict[T]]:
+    """Удалить и вернуть верхний элемент стека"""
+    top = stack["top"]
+    if top is None:
+        return None, stack
+    
+    return top.head, {"top": top.tail}
+
+def stack_peek(stack: StackDict[T]) -> Optional[T]:
+    """Посмотреть верхний элемент без удаления"""
+    top = stack["top"]
+    if top is None:
+        return None
+    return top.head
+
+def stack_is_empty(stack: StackDict[T]) -> bool:
+    """Проверить, пуст ли стек"""
+    return stack["top"] is None
+
+def stack_size(stack: StackDict[T]) -> int:
+    """Получить размер стека"""
+    return _cons_length(stack["top"])
+
+def stack_items(stack: StackDict[T]) -> List[T]:
+    """Элементы стека от дна к вершине"""
+    items = _cons_to_list(stack["top"])
+    items.reverse()
+    return items
+
+def stack_to_string(stack: StackDict[T]) -> str:
+    """Представить стек в виде строки"""
+    return f"Stack({stack_items(stack)})"
+
+def stack_push_many(stack: StackDict[T], items: Iterable[T]) -> StackDict[T]:
+    """Положить все элементы на вершину по очереди, создав одну новую версию"""
+    top = stack["top"]
+    for item in items:
+        top = _Cons(item, top)
+    return {"top": top}
+
+
+class StackTransient(Generic[T]):
+    """Изменяемый построитель стека (transient), см. QueueTransient"""
+    
+    __slots__ = ("_top", "_frozen")
+    
+    def __init__(self, stack: StackDict[T]) -> None:
+        self._top = stack["top"]
+        self._frozen: Optional[StackDict[T]] = None
+    
+    def _check(self) -> None:
+        if self._frozen is not None:
+            raise RuntimeError("Построитель уже заморожен")
+    
+    def push(self, item: T) -> None:
+        """Добавить элемент на вершину стека"""
+        self._check()
+        self._top = _Cons(item, self._top)
+    
+    def pop(self) -> Optional[T]:
+        """Удалить и вернуть верхний элемент"""
+        self._check()
+        if self._top is None:
+            return None
+        item = self._top.head
+        self._top = self._top.tail
+        return item
+    
+    def peek(self) -> Optional[T]:
+        """Посмотреть верхний элемент без удаления"""
+        return None if self._top is None else self._top.head
+    
+    def size(self) -> int:
+        """Получить размер стека"""
+        return _cons_length(self._top)
+    
+    def persistent(self) -> StackDict[T]:
+        """Заморозить построитель и вернуть неизменяемый стек"""
+        if self._frozen is None:
+            self._frozen = {"top": self._top}
+        return self._frozen
+
+
+@contextmanager
+def stack_transient(stack: StackDict[T]) -> Iterator[StackTransient[T]]:
+    """Построитель стека на время блока with; результат - t.persistent()"""
+    transient = StackTransient(stack)
+    yield transient
+    transient.persistent()
+
+
+# ---------- Функции для работы с очередью с приоритетом ----------
+
+class _LeftistNode(Generic[T]):
+    """Неизменяемый узел левосторонней кучи
+    
+    rank - длина правого пути; у левого потомка он не меньше, чем у
+    правого, поэтому слияние идёт по правому пути за O(log n) и
+    копирует только узлы этого пути - остальные разделяются версиями.
+    """
+    
+    __slots__ = ("key", "item", "rank", "size", "left", "right")
+    
+    def __init__(self, key: tuple, item: T,
+                 left: Optional["_LeftistNode[T]"] = None,
+                 right: Optional["_LeftistNode[T]"] = None) -> None:
+        if _leftist_rank(left) < _leftist_rank(right):
+            left, right = right, left
+        self.key = key
+        self.item = item
+        self.left = left
+        self.right = right
+        self.rank = _leftist_rank(right) + 1
+        self.size = _leftist_size(left) + _leftist_size(right) + 1
+
+
+def _leftist_rank(node: Optional[_LeftistNode[T]]) -> int:
+    return 0 if node is None else node.rank
+
+def _leftist_size(node: Optional[_LeftistNode[T]]) -> int:
+    return 0 if node is None else node.size
+
+def _leftist_merge(a: Optional[_LeftistNode[T]],
+                   b: Optional[_LeftistNode[T]]) -> Optional[_LeftistNode[T]]:
+    """Слить две кучи, не изменяя ни одну из них"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if b.key < a.key:
+        a, b = b, a
+    return _LeftistNode(a.key, a.item, a.left, _leftist_merge(a.right, b))
+
+
+# Ключ узла - пара (приоритет, номер добавления), поэтому элементы
+# с равным приоритетом извлекаются в порядке добавления.
+PriorityQueueDict = Dict[str, object]
+
+def create_priority_queue() -> PriorityQueueDict:
+    """Создать новую пустую очередь с приоритетом - функциональный стиль"""
+    return {"heap": None, "counter": 0}
+
+def priority_queue_push(pq: PriorityQueueDict, item: T, priority) -> PriorityQueueDict:
+    """Добавить элемент с приоритетом"""
+    node = _LeftistNode((priority, pq["counter"]), item)
+    return {"heap": _leftist_merge(pq["heap"], node), "counter": pq["counter"] + 1}
+
+def priority_queue_pop(pq: PriorityQueueDict) -> Tuple[Optional[T], PriorityQueueDict]:
+    """Удалить и вернуть элемент с наименьшим приоритетом"""
+    heap = pq["heap"]
+    if heap is None:
+        return None, pq
+    
+    return heap.item, {"heap": _leftist_merge(heap.left, heap.right), "counter": pq["counter"]}
+
+def priority_queue_peek(pq: PriorityQueueDict) -> Optional[T]:
+    """Посмотреть элемент с наименьшим приоритетом без удаления"""
+    heap = pq["heap"]
+    if heap is None:
+        return None
+    return heap.item
+
+def priority_queue_is_empty(pq: PriorityQueueDict) -> bool:
+    """Проверить, пуста ли очередь с приоритетом"""
+    return pq["heap"] is None
+
+def priority_queue_size(pq: PriorityQueueDict) -> int:
+    """Получить размер очереди с приоритетом"""
+    return _leftist_size(pq["heap"])
+
+def priority_queue_to_string(pq: PriorityQueueDict) -> str:
+    """Представить очередь с приоритетом в виде строки"""
+    items = []
+    while not priority_queue_is_empty(pq):
+        priority = pq["heap"].key[0]
+        item, pq = priority_queue_pop(pq)
+        items.append((item, priority))
+    return f"PriorityQueue({items})"
+
+
+# ==================== ДЕМОНСТРАЦИЯ И СРАВНЕНИЕ ====================
+
+def print_separator(title: str) -> None:
+    """Напечатать разделитель"""
+    print("\n" + "="*50)
+    print(f" {title} ")
+    print("="*50)
+
+def demonstrate_oop() -> None:
+    """Демонстрация ООП подхода"""
+    print_separator("ООП ПОДХОД")
+    
+    print("1. ОЧЕРЕДЬ (FIFO):")
+    q = Queue[int]()
+    print(f"Создана пустая очередь: {q}")
+    print(f"Очередь пуста? {q.is_empty()}")
+    
+    # Добавляем элементы
+    for i in [10, 20, 30]:
+        q.enqueue(i)
+        print(f"Добавили {i}: {q}")
+    
+    print(f"\nПервый элемент (peek): {q.peek()}")
+    print(f"Размер очереди: {q.size()}")
+    
+    # Извлекаем элементы
+    print("\nИзвлечение элементов:")
+    while not q.is_empty():
+        item = q.dequeue()
+        print(f"Извлекли {item}: {q}")
+    
+    print("\n2. СТЕК (LIFO):")
+    s = Stack[str]()
+    print(f"Создан пустой стек: {s}")
+    
+    # Добавляем элементы
+    for char in ['A', 'B', 'C']:
+        s.push(char)
+        print(f"Добавили '{char}': {s}")
+    
+    print(f"\nВерхний элемент (peek): {s.peek()}")
+    print(f"Размер стека: {s.size()}")
+    
+    # Извлекаем элементы
+    print("\nИзвлечение элементов:")
+    while not s.is_empty():
+        item = s.pop()
+        print(f"Извлекли '{item}': {s}")
+
+def _shared_close_first(queue: SharedQueue) -> None:
+    queue.put_many([1, 2, 3])
+    queue.close()
+
+def demonstrate_shared_queue() -> None:
+    """Демонстрация SharedQueue: дочерний процесс (fork) закрывает очередь первым"""
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return
+    print_separator("ОЧЕРЕДЬ В РАЗДЕЛЯЕМОЙ ПАМЯТИ")
+    context = multiprocessing.get_context("fork")
+    queue = SharedQueue(16, "q", context)
+    child = context.Process(target=_shared_close_first, args=(queue,))
+    child.start()
+    child.join()
+    print(f"Дочерний процесс закрыл очередь (код {child.exitcode}), получено: {queue.get_many(16)}")
+    queue.close()  # Память удаляет только создатель - ошибки нет
+    print("Родитель закрыл и удалил очередь")
+
+def demonstrate_functional() -> None:
+    """Демонстрация функционального подхода"""
+    print_separator("ФУНКЦИОНАЛЬНЫЙ ПОДХОД")
+    
+    print("1. ОЧЕРЕДЬ (FIFO):")
+    q = create_queue()
+    print(f"Создана пустая очередь: {queue_to_string(q)}")
+    print(f"Очередь пуста? {queue_is_empty(q)}")
+    
+    # Добавляем элементы (создаем новые очереди)
+    q = queue_enqueue(q, 10)
+    print(f"Добавили 10: {queue_to_string(q)}")
+    q = queue_enqueue(q, 20)
+    print(f"Добавили 20: {queue_to_string(q)}")
+    q = queue_enqueue(q, 30)
+    print(f"Добавили 30: {queue_to_string(q)}")
+    
+    print(f"\nПервый элемент (peek): {queue_peek(q)}")
+    print(f"Размер очереди: {queue_size(q)}")
+    
+    # Извлекаем элементы
+    print("\nИзвлечение элементов:")
+    while not queue_is_empty(q):
+        item, q = queue_dequeue(q)
+        print(f"Извлекли {item}: {queue_to_string(q)}")
+    
+    print("\n2. СТЕК (LIFO):")
+    s = create_stack()
+    print(f"Создан пустой стек: {stack_to_string(s)}")
+    
+    # Добавляем элементы
+    s = stack_push(s, 'X')
+    print(f"Добавили 'X': {stack_to_string(s)}")
+    s = stack_push(s, 'Y')
+    print(f"Добавили 'Y': {stack_to_string(s)}")
+    s = stack_push(s, 'Z')
+    print(f"Добавили 'Z': {stack_to_string(s)}")
+    
+    print(f"\nВерхний элемент (peek): {stack_peek(s)}")
+    print(f"Размер стека: {stack_size(s)}")
+    
+    # Извлекаем элементы
+    print("\nИзвлечение элементов:")
+    while not stack_is_empty(s):
+        item, s = stack_pop(s)
+        print(f"Извлекли '{item}': {stack_to_string(s)}")
+
+def compare_approaches() -> None:
+    """Сравнение двух подходов на одном примере"""
+    print_separator("СРАВНЕНИЕ ПОДХОДОВ")
+    
+    data = [1, 2, 3, 4, 5]
+    
+    print("Задача: добавить числа [1, 2, 3, 4, 5] и извлечь три элемента")
+    
+    # ООП подход
+    print("\n--- ООП подход ---")
+    oop_queue = Queue[int]()
+    for num in data:
+        oop_queue.enqueue(num)
+    print(f"После добавления всех чисел: {oop_queue}")
+    
+    results = []
+    for _ in range(3):
+        results.append(oop_queue.dequeue())
+    print(f"Извлекли три элемента: {results}")
+    print(f"Осталось в очереди: {oop_queue}")
+    
+    # Функциональный подход
+    print("\n--- Функциональный подход ---")
+    fp_queue = create_queue()
+    for num in data:
+        fp_queue = queue_enqueue(fp_queue, num)
+    print(f"После добавления всех чисел: {queue_to_string(fp_queue)}")
+    
+    results = []
+    current_queue = fp_queue
+    for _ in range(3):
+        item, current_queue = queue_dequeue(current_queue)
+        results.append(item)
+    print(f"Извлекли три элемента: {results}")
+    print(f"Осталось в очереди: {queue_to_string(current_queue)}")
+    
+    print("\n" + "-"*40)
+    print("КЛЮЧЕВЫЕ ОТЛИЧИЯ:")
+    print("-"*40)
+    print("1. ООП: методы работают с объектом (изменяют его состояние)")
+    print("2. ФП: функции возвращают новые структуры (старые не меняются)")
+    print("3. ООП: queue.enqueue(5) - добавляет в существующую очередь")
+    print("4. ФП: queue = queue_enqueue(queue, 5) - создает новую очередь")
+    print("5. ООП: естественная инкапсуляция (данные внутри объекта)")
+    print("6. ФП: данные явно передаются в функции")
+
+
+   
+
+def main() -> None:
+    """Главная функция программы"""
+    print("ЛАБОРАТОРНАЯ РАБОТА: РЕАЛИЗАЦИЯ QUEUE И STACK")
+    print("В ООП И ФУНКЦИОНАЛЬНОМ СТИЛЕ")
+    
+    demonstrate_oop()
+    demonstrate_shared_queue()
+    demonstrate_functional()
+    compare_approaches()
+    
+    print_separator("ЗАВЕРШЕНИЕ")
+    print("Программа демонстрирует разницу между:")
+    print("1. ООП - с классами, методами и состоянием объектов")
+    print("2. Функциональным стилем - с функциями и иммутабельными данными")
+
+# ==================== БЕНЧМАРКИ ====================
+
+class _ListQueue(Generic[T]):
+    """Прежняя реализация очереди на list.pop(0) - только для сравнения"""
+    
+    def __init__(self) -> None:
+        self.items: List[T] = []
+    
+    def enqueue(self, item: T) -> None:
+        self.items.append(item)
+    
+    def dequeue(self) -> Optional[T]:
+        if len(self.items) == 0:
+            return None
+        return self.items.pop(0)
+
+
+def _time_drain(queue_factory, n: int) -> float:
+    """Заполнить очередь n элементами и опустошить её; вернуть нс на dequeue"""
+    q = queue_factory()
+    for i in range(n):
+        q.enqueue(i)
+    start = time.perf_counter()
+    for _ in range(n):
+        q.dequeue()
+    return (time.perf_counter() - start) / n * 1e9
+
+def benchmark_queue_drain(sizes: Tuple[int, ...] = (1_000, 10_000, 100_000, 300_000)) -> None:
+    """Сравнить стоимость опустошения очереди: list.pop(0) против кольцевого буфера"""
+    print_separator("БЕНЧМАРК: ОПУСТОШЕНИЕ ОЧЕРЕДИ")
+    print(f"{'n':>10} {'list.pop(0), нс/оп':>20} {'кольцо, нс/оп':>16}")
+    for n in sizes:
+        list_ns = _time_drain(_ListQueue, n)
+        ring_ns = _time_drain(Queue, n)
+        print(f"{n:>10} {list_ns:>20.1f} {ring_ns:>16.1f}")
+    print("Время на операцию у кольцевого буфера не растёт с n (кривая плоская)")
+
+def _shared_producer(queue, n: int, batch: int) -> None:
+    """Производитель для бенчмарка межпроцессных очередей"""
+    if batch == 1:
+        for i in range(n):
+            queue.put(i)
+    else:
+        for start in range(0, n, batch):
+            queue.put_many(list(range(start, min(start + batch, n))))
+
+def _mp_queue_producer(queue, n: int) -> None:
+    for i in range(n):
+        queue.put(i)
+
+def benchmark_shared_queue(n: int = 200_000, batch: int = 1_000) -> None:
+    """Сравнить SharedQueue с multiprocessing.Queue на передаче n целых чисел"""
+    print_separator("БЕНЧМАРК: МЕЖПРОЦЕССНЫЕ ОЧЕРЕДИ")
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    
+    start = time.perf_counter()
+    mp_queue = context.Queue(maxsize=10_000)
+    producer = context.Process(target=_mp_queue_producer, args=(mp_queue, n))
+    producer.start()
+    for _ in range(n):
+        mp_queue.get()
+    producer.join()
+    print(f"multiprocessing.Queue, по одному:  {(time.perf_counter() - start) / n * 1e9:10.1f} нс/элемент")
+    
+    for size in (1, batch):
+        start = time.perf_counter()
+        with SharedQueue(10_000, "q", context) as queue:
+            producer = context.Process(target=_shared_producer, args=(queue, n, size))
+            producer.start()
+            received = 0
+            while received < n:
+                received += len(queue.get_many(size))
+            producer.join()
+        label = "по одному" if size == 1 else f"пачками по {size}"
+        print(f"SharedQueue, {label + ':':<22}{(time.perf_counter() - start) / n * 1e9:10.1f} нс/элемент")
+
+class _SharedQueueExecutor:
+    """Пул потоков с одной общей очередью задач - база для сравнения"""
+    
+    def __init__(self, workers: int) -> None:
+        self._tasks: BlockingQueue = BlockingQueue()
+        self._local = threading.local()
+        self._shutdown = False
+        self._threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(self, fn, *args) -> Future:
+        future: Future = Future()
+        self._tasks.put((fn, args, future))
+        return future
+    
+    def join(self, future: Future):
+        # Как и WorkStealingExecutor, ожидающая задача выполняет другие
+        while not future.done():
+            task = self._tasks.get(timeout=0 if getattr(self._local, "worker", False) else 0.001)
+            if task is not None:
+                self._run(task)
+        return future.result()
+    
+    @staticmethod
+    def _run(task) -> None:
+        fn, args, future = task
+        try:
+            future.set_result(fn(*args))
+        except BaseException as error:
+            future.set_exception(error)
+    
+    def _worker(self) -> None:
+        self._local.worker = True
+        while not self._shutdown:
+            task = self._tasks.get(timeout=0.01)
+            if task is not None:
+                self._run(task)
+    
+    def shutdown(self) -> None:
+        self._shutdown = True
+        for thread in self._threads:
+            thread.join()
+
+
+def _cofactor_determinant(matrix: List[List[int]]) -> int:
+    """Определитель разложением по первой строке, как determinant в Лабе 2"""
+    n = len(matrix)
+    if n == 1:
+        return matrix[0][0]
+    if n == 2:
+        return matrix[0][0] * matrix[1][1] - matrix[0][1] * matrix[1][0]
+    return sum((-1) ** j * matrix[0][j] * _cofactor_determinant([row[:j] + row[j + 1:] for row in matrix[1:]])
+               for j in range(n))
+
+def _task_determinant(executor, matrix: List[List[int]], cutoff: int) -> int:
+    """Рекурсивный определитель: каждый минор крупнее cutoff - отдельная задача"""
+    n = len(matrix)
+    if n <= cutoff:
+        return _cofactor_determinant(matrix)
+    futures = [executor.submit(_task_determinant, executor,
+                               [row[:j] + row[j + 1:] for row in matrix[1:]], cutoff)
+               for j in range(n)]
+    return sum((-1) ** j * matrix[0][j] * executor.join(future) for j, future in enumerate(futures))
+
+def benchmark_work_stealing(n: int = 8, cutoff: int = 5, workers: int = 4) -> None:
+    """Сравнить перехват работы с общей очередью на рекурсивном определителе"""
+    print_separator("БЕНЧМАРК: ПЕРЕХВАТ РАБОТЫ")
+    rng = random.Random(42)
+    matrix = [[rng.randint(-9, 9) for _ in range(n)] for _ in range(n)]
+    expected = _cofactor_determinant(matrix)
+    print(f"Определитель {n}x{n}, подзадачи до миноров {cutoff}x{cutoff}, потоков: {workers}")
+    
+    start = time.perf_counter()
+    shared = _SharedQueueExecutor(workers)
+    result = shared.join(shared.submit(_task_determinant, shared, matrix, cutoff))
+    shared.shutdown()
+    print(f"Общая очередь:    {time.perf_counter() - start:8.3f} с (верно: {result == expected})")
+    
+    start = time.perf_counter()
+    with WorkStealingExecutor(workers) as executor:
+        result = executor.join(executor.submit(_task_determinant, executor, matrix, cutoff))
+        stats = executor.stats()
+    print(f"Перехват работы:  {time.perf_counter() - start:8.3f} с (верно: {result == expected})")
+    print(f"Выполнено задач по потокам: {stats['executed']}, перехватов: {stats['steals']}")
+
+
+# ---------- Набор бенчмарков всех реализаций ----------
+
+class _BenchBackend:
+    """Описание реализации для набора бенчмарков
+    
+    Для ООП-реализаций push/pop получают контейнер и возвращают
+    связанный метод (его вызывают в цикле без лишних обёрток); для
+    функциональных - это сами функции, возвращающие новую версию.
+    """
+    
+    def __init__(self, name: str, make, push, pop, functional: bool = False) -> None:
+        self.name = name
+        self.make = make
+        self.push = push
+        self.pop = pop
+        self.functional = functional
+
+
+_BENCH_BACKENDS: Dict[str, _BenchBackend] = {backend.name: backend for backend in (
+    _BenchBackend("queue", Queue, lambda q: q.enqueue, lambda q: q.dequeue),
+    _BenchBackend("stack", Stack, lambda s: s.push, lambda s: s.pop),
+    _BenchBackend("typed_queue", lambda: Queue.of("q"), lambda q: q.enqueue, lambda q: q.dequeue),
+    _BenchBackend("typed_stack", lambda: Stack.of("q"), lambda s: s.push, lambda s: s.pop),
+    _BenchBackend("deque", Deque, lambda d: d.push_back, lambda d: d.pop_front),
+    _BenchBackend("priority_queue", PriorityQueue,
+                  lambda q: (lambda item: q.push(item, item)), lambda q: q.pop),
+    _BenchBackend("fp_queue", create_queue, queue_enqueue, queue_dequeue, functional=True),
+    _BenchBackend("fp_stack", create_stack, stack_push, stack_pop, functional=True),
+    _BenchBackend("fp_priority_queue", create_priority_queue,
+                  lambda pq, item: priority_queue_push(pq, item, item), priority_queue_pop,
+                  functional=True),
+)}
+
+# Потокобезопасные реализации для сценария "производители/потребители":
+# (создать, положить элемент, забрать элемент с таймаутом по номеру потребителя)
+_BENCH_CONCURRENT = {
+    "blocking_queue": (lambda: BlockingQueue(1024), lambda q, x: q.put(x),
+                       lambda q, i: q.get(timeout=0.1)),
+    "blocking_stack": (lambda: BlockingStack(1024), lambda q, x: q.put(x),
+                       lambda q, i: q.get(timeout=0.1)),
+    "sharded_queue": (lambda: ShardedQueue(4), lambda q, x: q.put(x),
+                      lambda q, i: q.get(i % q.shard_count, timeout=0.1)),
+}
+
+_BENCH_WORKLOADS = ("fill_drain", "mixed", "producer_consumer")
+
+
+def _bench_fill_drain(backend: _BenchBackend, n: int) -> int:
+    """Добавить n элементов и извлечь их все; вернуть число операций"""
+    container = backend.make()
+    if backend.functional:
+        push, pop = backend.push, backend.pop
+        for i in range(n):
+            container = push(container, i)
+        for _ in range(n):
+            _, container = pop(container)
+    else:
+        push, pop = backend.push(container), backend.pop(container)
+        for i in range(n):
+            push(i)
+        for _ in range(n):
+            pop()
+    return 2 * n
+
+@functools.lru_cache(maxsize=None)
+def _bench_pattern(n: int) -> List[bool]:
+    """Воспроизводимая последовательность операций: True - добавление"""
+    return random.Random(n).choices((True, False), weights=(3, 2), k=n)
+
+def _bench_mixed(backend: _BenchBackend, n: int) -> int:
+    """n операций вперемешку: примерно 60% добавлений и 40% извлечений"""
+    pattern = _bench_pattern(n)
+    container = backend.make()
+    if backend.functional:
+        push, pop = backend.push, backend.pop
+        for i, is_push in enumerate(pattern):
+            if is_push:
+                container = push(container, i)
+            else:
+                _, container = pop(container)
+    else:
+        push, pop = backend.push(container), backend.pop(container)
+        for i, is_push in enumerate(pattern):
+            if is_push:
+                push(i)
+            else:
+                pop()
+    return n
+
+def _bench_producer_consumer(name: str, n: int, threads: int = 2) -> int:
+    """threads производителей и столько же потребителей передают n элементов"""
+    make, put, get = _BENCH_CONCURRENT[name]
+    container = make()
+    received = [0] * threads
+    share = n // threads
+    
+    def produce() -> None:
+        for i in range(share):
+            put(container, i)
+    
+    def consume(index: int) -> None:
+        while sum(received) < share * threads:
+            if get(container, index) is not None:
+                received[index] += 1
+    
+    workers = [threading.Thread(target=produce) for _ in range(threads)]
+    workers += [threading.Thread(target=consume, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return share * threads
+
+def _bench_call(backend_name: str, workload: str, n: int) -> int:
+    if workload == "producer_consumer":
+        return _bench_producer_consumer(backend_name, n)
+    backend = _BENCH_BACKENDS[backend_name]
+    if workload == "fill_drain":
+        return _bench_fill_drain(backend, n)
+    return _bench_mixed(backend, n)
+
+def _peak_rss_kb() -> Optional[int]:
+    """Пик резидентной памяти процесса в КиБ; None - если недоступен"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS возвращает ru_maxrss в байтах, Linux и BSD - в килобайтах
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def _bench_measure(backend_name: str, workload: str, n: int, repeat: int) -> Dict[str, object]:
+    """Измерить один случай: лучшее время из repeat, пик tracemalloc и пик RSS"""
+    rss_before = _peak_rss_kb()
+    best = None
+    operations = 0
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        operations = _bench_call(backend_name, workload, n)
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    rss_after = _peak_rss_kb()
+    
+    tracemalloc.start()
+    _bench_call(backend_name, workload, n)
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "backend": backend_name,
+        "workload": workload,
+        "size": n,
+        "ops": operations,
+        "ns_per_op": best / max(operations, 1),
+        "alloc_peak_bytes": alloc_peak,
+        "peak_rss_kb": rss_after,
+        "rss_growth_kb": None if rss_after is None else rss_after - rss_before,
+    }
+
+def _bench_measure_isolated(backend_name: str, workload: str, n: int, repeat: int) -> Dict[str, object]:
+    """Измерить случай в отдельном процессе, чтобы пик RSS относился только к нему"""
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return _bench_measure(backend_name, workload, n, repeat)
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    
+    def child() -> None:
+        sender.send(_bench_measure(backend_name, workload, n, repeat))
+        sender.close()
+    
+    process = context.Process(target=child)
+    process.start()
+    result = receiver.recv()
+    process.join()
+    return result
+
+def run_benchmark_suite(sizes: Iterable[int] = (10, 1_000, 100_000),
+                        backends: Optional[Iterable[str]] = None,
+                        workloads: Iterable[str] = _BENCH_WORKLOADS,
+                        repeat: int = 3, isolate: bool = True) -> Dict[str, object]:
+    """Прогнать все сочетания реализация/сценарий/размер и вернуть результаты"""
+    measure = _bench_measure_isolated if isolate else _bench_measure
+    selected = None if backends is None else set(backends)
+    results = []
+    for workload in workloads:
+        names = _BENCH_CONCURRENT if workload == "producer_consumer" else _BENCH_BACKENDS
+        for name in names:
+            if selected is not None and name not in selected:
+                continue
+            for n in sizes:
+                result = measure(name, workload, n, repeat)
+                results.append(result)
+                print(f"{name:>18} {workload:>18} {n:>10} {result['ns_per_op']:>12.1f} нс/оп "
+                      f"{result['alloc_peak_bytes'] / 1024:>12.1f} КиБ")
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+def compare_benchmarks(current: Dict[str, object], baseline: Dict[str, object],
+                       threshold: float = 0.10) -> List[Dict[str, object]]:
+    """Сравнить результаты с базовыми; вернуть случаи, замедлившиеся больше чем на threshold"""
+    def key(result: Dict[str, object]) -> Tuple[str, str, int]:
+        return result["backend"], result["workload"], result["size"]
+    
+    base = {key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = base.get(key(result))
+        if old is None or not old["ns_per_op"]:
+            continue
+        ratio = result["ns_per_op"] / old["ns_per_op"]
+        status = "РЕГРЕССИЯ" if ratio > 1 + threshold else "ok"
+        print(f"{result['backend']:>18} {result['workload']:>18} {result['size']:>10} "
+              f"{old['ns_per_op']:>10.1f} -> {result['ns_per_op']:>10.1f} нс/оп  x{ratio:.2f}  {status}")
+        if status != "ok":
+            regressions.append({"backend": result["backend"], "workload": result["workload"],
+                                "size": result["size"], "ratio": ratio})
+    return regressions
+
+def benchmark_cli(argv: List[str]) -> int:
+    """Разбор аргументов командной строки для бенчмарков; код возврата процесса"""
+    parser = argparse.ArgumentParser(description="Бенчмарки очередей и стеков")
+    parser.add_argument("--bench", action="store_true", help="демонстрационные бенчмарки")
+    parser.add_argument("--suite", action="store_true", help="полный набор бенчмарков")
+    parser.add_argument("--sizes", default="10,1000,100000",
+                        help="размеры через запятую (до 10000000)")
+    parser.add_argument("--backends", help="реализации через запятую: "
+                        + ", ".join(list(_BENCH_BACKENDS) + list(_BENCH_CONCURRENT)))
+    parser.add_argument("--workloads", default=",".join(_BENCH_WORKLOADS),
+                        help="сценарии через запятую: " + ", ".join(_BENCH_WORKLOADS))
+    parser.add_argument("--repeat", type=int, default=3, help="повторов на случай (берётся лучший)")
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="не запускать каждый случай в отдельном процессе")
+    parser.add_argument("--json", help="записать результаты в JSON-файл")
+    parser.add_argument("--compare", help="JSON с базовыми результатами для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="допустимое замедление относительно базы (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+    
+    if args.bench:
+        run_benchmarks()
+    if not args.suite:
+        return 0
+    
+    print_separator("НАБОР БЕНЧМАРКОВ")
+    results = run_benchmark_suite(
+        sizes=[int(size) for size in args.sizes.split(",")],
+        backends=None if args.backends is None else args.backends.split(","),
+        workloads=args.workloads.split(","),
+        repeat=args.repeat,
+        isolate=not args.no_isolate,
+    )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print_separator("СРАВНЕНИЕ С БАЗОЙ")
+        regressions = compare_benchmarks(results, baseline, args.threshold)
+        print(f"Регрессий: {len(regressions)}")
+        return 1 if regressions else 0
+    return 0
+
+
+def run_benchmarks() -> None:
+    """Запустить все бенчмарки модуля"""
+    benchmark_queue_drain()
+    benchmark_shared_queue()
+    benchmark_work_stealing()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:]:
+        sys.exit(benchmark_cli(sys.argv[1:]))
+    main()
 1
\ No newline at end of file
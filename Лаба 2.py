@@ -1,338 +1,1691 @@
-# ==================== ООП-СТИЛЬ ====================
-
-class Matrix:
-    def __init__(self, data):
-        self.data = data
-        self.rows = len(data)
-        self.cols = len(data[0]) if data else 0
-    
-    def __add__(self, other):
-        if self.rows != other.rows or self.cols != other.cols:
-            raise ValueError("Матрицы должны быть одного размера")
-        
-        result = []
-        for i in range(self.rows):
-            row = []
-            for j in range(self.cols):
-                row.append(self.data[i][j] + other.data[i][j])
-            result.append(row)
-        return Matrix(result)
-    
-    def __mul__(self, other):
-        # Умножение на скаляр
-        if isinstance(other, (int, float)):
-            result = []
-            for i in range(self.rows):
-                row = []
-                for j in range(self.cols):
-                    row.append(self.data[i][j] * other)
-                result.append(row)
-            return Matrix(result)
-        
-        # Умножение матриц
-        elif isinstance(other, Matrix):
-            if self.cols != other.rows:
-                raise ValueError("Количество столбцов первой матрицы должно совпадать с количеством строк второй матрицы")
-            
-            result = []
-            for i in range(self.rows):
-                row = []
-                for j in range(other.cols):
-                    sum_val = 0
-                    for k in range(self.cols):
-                        sum_val += self.data[i][k] * other.data[k][j]
-                    row.append(sum_val)
-                result.append(row)
-            return Matrix(result)
-        
-        else:
-            raise TypeError("Неподдерживаемый тип операнда")
-    
-    def transpose(self):
-        result = []
-        for j in range(self.cols):
-            row = []
-            for i in range(self.rows):
-                row.append(self.data[i][j])
-            result.append(row)
-        return Matrix(result)
-    
-    def determinant(self):
-        if self.rows != self.cols:
-            raise ValueError("Матрица должна быть квадратной")
-        
-        # Базовый случай для матрицы 1x1
-        if self.rows == 1:
-            return self.data[0][0]
-        
-        # Базовый случай для матрицы 2x2
-        if self.rows == 2:
-            return self.data[0][0] * self.data[1][1] - self.data[0][1] * self.data[1][0]
-        
-        det = 0
-        # Разложение по первой строке
-        for j in range(self.cols):
-            # Создаем минор
-            minor = []
-            for i in range(1, self.rows):
-                row = []
-                for k in range(self.cols):
-                    if k != j:
-                        row.append(self.data[i][k])
-                minor.append(row)
-            
-            minor_matrix = Matrix(minor)
-            det += ((-1) ** j) * self.data[0][j] * minor_matrix.determinant()
-        
-        return det
-    
-    def __str__(self):
-        return '\n'.join([' '.join(map(str, row)) for row in self.data])
-    
-    def __repr__(self):
-        return f"Matrix({self.data})"
-
-
-# ==================== ФУНКЦИОНАЛЬНЫЙ СТИЛЬ ====================
-
-def create_matrix(data):
-    """Создает матрицу из списка списков"""
-    return data
-
-def matrix_rows(matrix):
-    """Возвращает количество строк матрицы"""
-    return len(matrix)
-
-def matrix_cols(matrix):
-    """Возвращает количество столбцов матрицы"""
-    return len(matrix[0]) if matrix else 0
-
-def matrix_add(m1, m2):
-    """Сложение матриц"""
-    if matrix_rows(m1) != matrix_rows(m2) or matrix_cols(m1) != matrix_cols(m2):
-        raise ValueError("Матрицы должны быть одного размера")
-    
-    result = []
-    for i in range(matrix_rows(m1)):
-        row = []
-        for j in range(matrix_cols(m1)):
-            row.append(m1[i][j] + m2[i][j])
-        result.append(row)
-    return result
-
-def matrix_multiply(m1, m2):
-    """Умножение матриц"""
-    if matrix_cols(m1) != matrix_rows(m2):
-        raise ValueError("Количество столбцов первой матрицы должно совпадать с количеством строк второй матрицы")
-    
-    result = []
-    for i in range(matrix_rows(m1)):
-        row = []
-        for j in range(matrix_cols(m2)):
-            sum_val = 0
-            for k in range(matrix_cols(m1)):
-                sum_val += m1[i][k] * m2[k][j]
-            row.append(sum_val)
-        result.append(row)
-    return result
-
-def scalar_multiply(matrix, scalar):
-    """Умножение матрицы на скаляр"""
-    result = []
-    for i in range(matrix_rows(matrix)):
-        row = []
-        for j in range(matrix_cols(matrix)):
-            row.append(matrix[i][j] * scalar)
-        result.append(row)
-    return result
-
-def transpose(matrix):
-    """Транспонирование матрицы"""
-    result = []
-    for j in range(matrix_cols(matrix)):
-        row = []
-        for i in range(matrix_rows(matrix)):
-            row.append(matrix[i][j])
-        result.append(row)
-    return result
-
-def determinant(matrix):
-    """Вычисление определителя матрицы"""
-    if matrix_rows(matrix) != matrix_cols(matrix):
-        raise ValueError("Матрица должна быть квадратной")
-    
-    n = matrix_rows(matrix)
-    
-    # Базовый случай для матрицы 1x1
-    if n == 1:
-        return matrix[0][0]
-    
-    # Базовый случай для матрицы 2x2
-    if n == 2:
-        return matrix[0][0] * matrix[1][1] - matrix[0][1] * matrix[1][0]
-    
-    det = 0
-    # Разложение по первой строке
-    for j in range(n):
-        # Создаем минор
-        minor = []
-        for i in range(1, n):
-            row = []
-            for k in range(n):
-                if k != j:
-                    row.append(matrix[i][k])
-            minor.append(row)
-        
-        det += ((-1) ** j) * matrix[0][j] * determinant(minor)
-    
-    return det
-
-def print_matrix(matrix):
-    """Печать матрицы"""
-    for row in matrix:
-        print(' '.join(map(str, row)))
-
-
-# ==================== ТЕСТИРОВАНИЕ ОБОИХ СТИЛЕЙ ====================
-
-def test_oop_style():
-    print("=== ТЕСТИРОВАНИЕ ООП-СТИЛЯ ===")
-    m1 = Matrix([[1, 2], [2, 3]])
-    m2 = Matrix([[2, 5], [7, 9]])
-    
-    print("Матрица m1:")
-    print(m1)
-    print("\nМатрица m2:")
-    print(m2)
-    
-    m3 = m1 + m2
-    print("\nm1 + m2:")
-    print(m3)
-    
-    m4 = m1 * m2
-    print("\nm1 * m2:")
-    print(m4)
-    
-    m5 = m1.transpose()
-    print("\nТранспонированная m1:")
-    print(m5)
-    
-    m6 = m1 * 3
-    print("\nm1 * 3:")
-    print(m6)
-    
-    det = m1.determinant()
-    print(f"\nОпределитель m1: {det}")
-    
-    return m1, m2, m3, m4, m5, m6, det
-
-def test_functional_style():
-    print("\n\n=== ТЕСТИРОВАНИЕ ФУНКЦИОНАЛЬНОГО СТИЛЯ ===")
-    m1 = create_matrix([[1, 2], [2, 3]])
-    m2 = create_matrix([[2, 5], [7, 9]])
-    
-    print("Матрица m1:")
-    print_matrix(m1)
-    print("\nМатрица m2:")
-    print_matrix(m2)
-    
-    m3 = matrix_add(m1, m2)
-    print("\nm1 + m2:")
-    print_matrix(m3)
-    
-    m4 = matrix_multiply(m1, m2)
-    print("\nm1 * m2:")
-    print_matrix(m4)
-    
-    m5 = transpose(m1)
-    print("\nТранспонированная m1:")
-    print_matrix(m5)
-    
-    m6 = scalar_multiply(m1, 3)
-    print("\nm1 * 3:")
-    print_matrix(m6)
-    
-    det = determinant(m1)
-    print(f"\nОпределитель m1: {det}")
-    
-    return m1, m2, m3, m4, m5, m6, det
-
-def compare_results(oop_results, func_results):
-    print("\n\n=== СРАВНЕНИЕ РЕЗУЛЬТАТОВ ===")
-    
-    # Извлекаем результаты из кортежей
-    oop_m1, oop_m2, oop_m3, oop_m4, oop_m5, oop_m6, oop_det = oop_results
-    func_m1, func_m2, func_m3, func_m4, func_m5, func_m6, func_det = func_results
-    
-    # Сравниваем каждую операцию
-    print("1. Сложение матриц:")
-    print(f"   ООП-результат: {oop_m3.data}")
-    print(f"   Функциональный результат: {func_m3}")
-    print(f"   Результаты совпадают: {oop_m3.data == func_m3}")
-    
-    print("\n2. Умножение матриц:")
-    print(f"   ООП-результат: {oop_m4.data}")
-    print(f"   Функциональный результат: {func_m4}")
-    print(f"   Результаты совпадают: {oop_m4.data == func_m4}")
-    
-    print("\n3. Транспонирование:")
-    print(f"   ООП-результат: {oop_m5.data}")
-    print(f"   Функциональный результат: {func_m5}")
-    print(f"   Результаты совпадают: {oop_m5.data == func_m5}")
-    
-    print("\n4. Умножение на скаляр:")
-    print(f"   ООП-результат: {oop_m6.data}")
-    print(f"   Функциональный результат: {func_m6}")
-    print(f"   Результаты совпадают: {oop_m6.data == func_m6}")
-    
-    print("\n5. Определитель:")
-    print(f"   ООП-результат: {oop_det}")
-    print(f"   Функциональный результат: {func_det}")
-    print(f"   Результаты совпадают: {oop_det == func_det}")
-
-def main():
-    print("=" * 50)
-    print("Лабораторная работа 2: Матрицы")
-    print("Реализация в ООП и функциональном стиле")
-    print("=" * 50)
-    
-    # Тестируем ООП-стиль
-    oop_results = test_oop_style()
-    
-    # Тестируем функциональный стиль
-    func_results = test_functional_style()
-    
-    # Сравниваем результаты
-    compare_results(oop_results, func_results)
-    
-    # Дополнительный пример с матрицами 3x3
-    print("\n\n" + "=" * 50)
-    print("ДОПОЛНИТЕЛЬНЫЙ ПРИМЕР (матрицы 3x3):")
-    print("=" * 50)
-    
-    # ООП-стиль
-    print("\nООП-стиль:")
-    m1_oop = Matrix([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
-    m2_oop = Matrix([[9, 8, 7], [6, 5, 4], [3, 2, 1]])
-    print(f"Матрица 1:\n{m1_oop}")
-    print(f"\nМатрица 2:\n{m2_oop}")
-    print(f"\nСумма:\n{m1_oop + m2_oop}")
-    print(f"\nПроизведение:\n{m1_oop * m2_oop}")
-    print(f"\nОпределитель матрицы 1: {m1_oop.determinant()}")
-    
-    # Функциональный стиль
-    print("\nФункциональный стиль:")
-    m1_func = create_matrix([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
-    m2_func = create_matrix([[9, 8, 7], [6, 5, 4], [3, 2, 1]])
-    print("Матрица 1:")
-    print_matrix(m1_func)
-    print("\nМатрица 2:")
-    print_matrix(m2_func)
-    print("\nСумма:")
-    print_matrix(matrix_add(m1_func, m2_func))
-    print("\nПроизведение:")
-    print_matrix(matrix_multiply(m1_func, m2_func))
-    print(f"\nОпределитель матрицы 1: {determinant(m1_func)}")
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+import bisect
+import concurrent.futures
+import numbers
+import operator
+import os
+import random
+import sys
+import time
+from abc import ABC, abstractmethod
+from array import array
+from contextlib import contextmanager
+from fractions import Fraction
+from multiprocessing import resource_tracker, shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен - без него работает чистый Python
+    np = None
+
+
+# ==================== ВЫБОР БЭКЕНДА ====================
+
+# "auto" - NumPy для крупных матриц, "numpy" - всегда NumPy, "python" - никогда
+_BACKEND = "auto"
+
+# С какого размера (наибольшего измерения) в режиме "auto" выгодно
+# переходить на NumPy: для мелких матриц дороже само преобразование
+NUMPY_MIN_SIZE = 32
+
+# Целые числа NumPy хранит в int64 - больше этого модуля результат переполнится
+_INT64_LIMIT = 2 ** 63
+
+def set_backend(name):
+    """Выбрать бэкенд для операций Matrix: "auto", "numpy" или "python" """
+    global _BACKEND
+    if name not in ("auto", "numpy", "python"):
+        raise ValueError(f"Неизвестный бэкенд: {name}")
+    if name == "numpy" and np is None:
+        raise ValueError("NumPy не установлен")
+    _BACKEND = name
+
+def get_backend():
+    """Текущий бэкенд для операций Matrix"""
+    return _BACKEND
+
+def _int_bound(values):
+    """Наибольший модуль элемента целочисленного ndarray (как int Python)"""
+    if values.size == 0:
+        return 0
+    return max(int(values.max()), -int(values.min()))
+
+def _exact_in_numpy(result_bound, *arrays):
+    """Можно ли посчитать в NumPy без потери точности
+    
+    Вещественные массивы подходят всегда; для целых оценка модуля
+    результата result_bound не должна выходить за пределы int64.
+    """
+    if all(values.dtype.kind == "f" for values in arrays):
+        return True
+    return result_bound() < _INT64_LIMIT
+
+
+# ==================== УМНОЖЕНИЕ МАТРИЦ ====================
+
+# Сколько столбцов второй матрицы обрабатывается за один проход по строкам
+# первой: блок столбцов остаётся в кэше, пока с ним умножаются все строки
+GEMM_BLOCK = 64
+
+# Целые произведения, помещающиеся в int64, считаются упакованными строками
+_PACK_LIMIT = 1 << 63
+
+def _all_ints(*matrices):
+    return all(type(x) is int for m in matrices for row in m for x in row)
+
+def _gemm_packed(a, b):
+    """Произведение целых матриц через упаковку строк в длинные целые
+    
+    Строка b[k] упаковывается в одно число sum(b[k][j] << 64j), тогда
+    строка результата - это sum(a[i][k] * упакованная b[k]): n умножений
+    длинных чисел на C вместо n² умножений элементов. Каждый элемент
+    результата занимает свои 64 бита; смещение на 2^63 (XOR старшего
+    бита) позволяет упаковывать и распаковывать через array('q').
+    Возвращает None, если элементы результата могут не поместиться в int64.
+    """
+    cols = len(b[0])
+    a_max = max((abs(x) for row in a for x in row), default=0)
+    b_max = max((abs(x) for row in b for x in row), default=0)
+    if len(b) * a_max * b_max >= _PACK_LIMIT or b_max >= _PACK_LIMIT:
+        return None
+    bias = int.from_bytes(array("Q", [_PACK_LIMIT]).tobytes() * cols, sys.byteorder)
+    packed = [(int.from_bytes(array("q", row).tobytes(), sys.byteorder) ^ bias) - bias
+              for row in b]
+    result = []
+    for row in a:
+        out = array("q")
+        out.frombytes(((sum(map(operator.mul, row, packed)) + bias) ^ bias)
+                      .to_bytes(8 * cols, sys.byteorder))
+        result.append(out.tolist())
+    return result
+
+def _gemm(a, b):
+    """Произведение матриц, заданных списками строк, на чистом Python
+    
+    Целые матрицы, результат которых помещается в int64, умножаются
+    упакованными строками (_gemm_packed): примерно в 9 раз быстрее
+    прежнего цикла i-j-k при n = 100..200. Остальные (вещественные,
+    дроби, большие целые) - транспонированием второй матрицы и
+    вызовом sum(map(operator.mul, строка, столбец)) на каждый элемент,
+    столбцы блоками по GEMM_BLOCK: это быстрее цикла i-j-k лишь
+    примерно в 2 раза, больше чистый Python не даёт.
+    """
+    if a and b and b[0] and _all_ints(a, b):
+        result = _gemm_packed(a, b)
+        if result is not None:
+            return result
+    columns = list(zip(*b))
+    mul = operator.mul
+    result = [[] for _ in a]
+    for start in range(0, len(columns), GEMM_BLOCK):
+        block = columns[start:start + GEMM_BLOCK]
+        for row, out in zip(a, result):
+            out.extend([sum(map(mul, row, column)) for column in block])
+    return result
+
+
+# Размер, до которого рекурсия Штрассена спускается, прежде чем перейти
+# к обычному ядру _gemm; в режиме "auto" меньшие матрицы она не трогает
+STRASSEN_CUTOFF = 128
+
+_MULTIPLY_METHODS = ("auto", "standard", "strassen")
+_MULTIPLY_METHOD = "auto"
+
+def set_multiply_method(name):
+    """Выбрать алгоритм умножения на чистом Python: "auto", "standard" или "strassen" """
+    global _MULTIPLY_METHOD
+    if name not in _MULTIPLY_METHODS:
+        raise ValueError(f"Неизвестный метод умножения: {name}")
+    _MULTIPLY_METHOD = name
+
+def _madd(x, y):
+    return [list(map(operator.add, r, s)) for r, s in zip(x, y)]
+
+def _msub(x, y):
+    return [list(map(operator.sub, r, s)) for r, s in zip(x, y)]
+
+def _strassen(a, b, cutoff):
+    """Произведение квадратных матриц n x n рекурсией Штрассена
+    
+    Семь произведений половинного размера вместо восьми: O(n^2.81).
+    Нечётный размер дополняется нулевой строкой и столбцом.
+    """
+    n = len(a)
+    if n <= cutoff:
+        return _gemm(a, b)
+    if n % 2:
+        a = [row + [0] for row in a] + [[0] * (n + 1)]
+        b = [row + [0] for row in b] + [[0] * (n + 1)]
+        return [row[:n] for row in _strassen(a, b, cutoff)[:n]]
+    h = n // 2
+    a11, a12 = [row[:h] for row in a[:h]], [row[h:] for row in a[:h]]
+    a21, a22 = [row[:h] for row in a[h:]], [row[h:] for row in a[h:]]
+    b11, b12 = [row[:h] for row in b[:h]], [row[h:] for row in b[:h]]
+    b21, b22 = [row[:h] for row in b[h:]], [row[h:] for row in b[h:]]
+    m1 = _strassen(_madd(a11, a22), _madd(b11, b22), cutoff)
+    m2 = _strassen(_madd(a21, a22), b11, cutoff)
+    m3 = _strassen(a11, _msub(b12, b22), cutoff)
+    m4 = _strassen(a22, _msub(b21, b11), cutoff)
+    m5 = _strassen(_madd(a11, a12), b22, cutoff)
+    m6 = _strassen(_msub(a21, a11), _madd(b11, b12), cutoff)
+    m7 = _strassen(_msub(a12, a22), _madd(b21, b22), cutoff)
+    c11 = _madd(_msub(_madd(m1, m4), m5), m7)
+    c12 = _madd(m3, m5)
+    c21 = _madd(m2, m4)
+    c22 = _madd(_madd(_msub(m1, m2), m3), m6)
+    return ([r + s for r, s in zip(c11, c12)] +
+            [r + s for r, s in zip(c21, c22)])
+
+def _strassen_multiply(a, b, cutoff=None):
+    """Произведение произвольных матриц через Штрассена
+    
+    Прямоугольные матрицы дополняются нулями до общего квадратного размера.
+    """
+    cutoff = STRASSEN_CUTOFF if cutoff is None else cutoff
+    rows, inner, cols = len(a), len(b), len(b[0])
+    size = max(rows, inner, cols)
+    if rows == inner == cols:
+        return _strassen(a, b, cutoff)
+    a = [row + [0] * (size - inner) for row in a] + [[0] * size for _ in range(size - rows)]
+    b = [row + [0] * (size - cols) for row in b] + [[0] * size for _ in range(size - inner)]
+    return [row[:cols] for row in _strassen(a, b, cutoff)[:rows]]
+
+def _multiply(a, b, method=None):
+    """Произведение матриц (списки строк) выбранным алгоритмом
+    
+    method=None берёт глобальный режим (см. set_multiply_method). "auto"
+    включает Штрассена только для квадратных матриц больше STRASSEN_CUTOFF,
+    кроме целых, которые умножаются упакованными строками.
+    При set_workers(n > 1) крупные произведения делятся между процессами.
+    """
+    method = _MULTIPLY_METHOD if method is None else method
+    if method not in _MULTIPLY_METHODS:
+        raise ValueError(f"Неизвестный метод умножения: {method}")
+    if a and b and b[0] and _parallel_ok(len(a), len(b), len(b[0])):
+        result = _parallel_multiply(a, b, method)
+        if result is not None:
+            return result
+    return _multiply_serial(a, b, method)
+
+def _multiply_serial(a, b, method):
+    if not a or not b or not b[0]:
+        return _gemm(a, b)
+    if method == "strassen":
+        return _strassen_multiply(a, b)
+    if method == "auto" and len(a) > STRASSEN_CUTOFF and len(a) == len(b) == len(b[0]):
+        # Упакованное целое ядро быстрее Штрассена на любых размерах
+        result = _gemm_packed(a, b) if _all_ints(a, b) else None
+        return _strassen_multiply(a, b) if result is None else result
+    return _gemm(a, b)
+
+
+# ==================== ОПРЕДЕЛИТЕЛЬ ИСКЛЮЧЕНИЕМ ====================
+
+def _determinant_bareiss(rows):
+    """Определитель целой или рациональной матрицы методом Барейса
+    
+    Исключение без дробей: каждое деление на предыдущий ведущий элемент
+    нацело, поэтому промежуточные значения остаются точными и растут
+    не быстрее миноров исходной матрицы. O(n³) операций.
+    """
+    exact_ints = all(isinstance(x, int) for row in rows for x in row)
+    # Смесь целых и дробей приводим к Fraction: иначе int / int даёт float
+    m = [list(row) for row in rows] if exact_ints else [[Fraction(x) for x in row] for row in rows]
+    n = len(m)
+    sign = 1
+    previous = 1
+    for k in range(n - 1):
+        if m[k][k] == 0:
+            # Ищем ненулевой ведущий элемент ниже и меняем строки местами
+            swap = next((i for i in range(k + 1, n) if m[i][k] != 0), None)
+            if swap is None:
+                return 0
+            m[k], m[swap] = m[swap], m[k]
+            sign = -sign
+        pivot_row = m[k]
+        pivot = pivot_row[k]
+        tail = pivot_row[k + 1:]
+        for i in range(k + 1, n):
+            row = m[i]
+            factor = row[k]
+            if exact_ints:
+                row[k + 1:] = [(x * pivot - factor * y) // previous
+                               for x, y in zip(row[k + 1:], tail)]
+            else:
+                row[k + 1:] = [(x * pivot - factor * y) / previous
+                               for x, y in zip(row[k + 1:], tail)]
+        previous = pivot
+    return sign * m[n - 1][n - 1] if n else 1
+
+def _determinant_lu(rows):
+    """Определитель вещественной матрицы LU-разложением с выбором ведущего элемента
+    
+    Ведущим берётся наибольший по модулю элемент столбца, что держит
+    множители не больше единицы и ограничивает рост ошибки округления.
+    """
+    m = [list(row) for row in rows]
+    n = len(m)
+    det = 1.0
+    for k in range(n):
+        pivot_index = max(range(k, n), key=lambda i: abs(m[i][k]))
+        if m[pivot_index][k] == 0:
+            return 0.0
+        if pivot_index != k:
+            m[k], m[pivot_index] = m[pivot_index], m[k]
+            det = -det
+        pivot_row = m[k]
+        pivot = pivot_row[k]
+        det *= pivot
+        tail = pivot_row[k + 1:]
+        for i in range(k + 1, n):
+            row = m[i]
+            factor = row[k] / pivot
+            if factor:
+                row[k + 1:] = [x - factor * y for x, y in zip(row[k + 1:], tail)]
+    return det
+
+def _determinant(rows):
+    """Определитель квадратной матрицы за O(n³)
+    
+    Целые и дробные (Fraction) матрицы считаются точно методом Барейса,
+    остальные - LU-разложением в плавающей точке.
+    """
+    if all(isinstance(x, numbers.Rational) for row in rows for x in row):
+        return _determinant_bareiss(rows)
+    if _parallel_ok(len(rows)):
+        det = _parallel_determinant(rows)
+        if det is not None:
+            return det
+    return _determinant_lu(rows)
+
+
+# ==================== ПАРАЛЛЕЛЬНЫЕ ВЫЧИСЛЕНИЯ ====================
+
+# Число процессов для умножения, сложения и определителя; 1 - без параллелизма
+_WORKERS = 1
+
+# С какого размера (наибольшего измерения) подключать процессы: для мелких
+# матриц копирование в общую память и передача задач дороже самих вычислений
+PARALLEL_MIN_SIZE = 256
+
+_POOL = None  # (число процессов, ProcessPoolExecutor)
+
+def set_workers(count=None):
+    """Задать число процессов (None - по числу ядер, 1 - считать в одном процессе)"""
+    global _WORKERS
+    if count is None:
+        count = os.cpu_count() or 1
+    if count < 1:
+        raise ValueError("Число процессов должно быть положительным")
+    _WORKERS = count
+
+def get_workers():
+    """Текущее число процессов"""
+    return _WORKERS
+
+def _pool():
+    global _POOL
+    if _POOL is None or _POOL[0] != _WORKERS:
+        if _POOL is not None:
+            _POOL[1].shutdown()
+        if os.name == "posix":
+            # Процессы должны разделять трекер ресурсов главного процесса: иначе
+            # каждый запустит свой и при выходе сочтёт общую память утёкшей
+            resource_tracker.ensure_running()
+        _POOL = (_WORKERS, concurrent.futures.ProcessPoolExecutor(_WORKERS))
+    return _POOL[1]
+
+def _parallel_ok(*sizes):
+    return _WORKERS > 1 and max(sizes) >= PARALLEL_MIN_SIZE
+
+def _blocks(start, stop, parts):
+    """Разбить [start, stop) на не больше parts смежных кусков"""
+    step = max(-(-(stop - start) // parts), 1)
+    return [(first, min(first + step, stop)) for first in range(start, stop, step)]
+
+def _typed(values):
+    """Элементы как array('q') или array('d'); None - если их нельзя разделить"""
+    if type(values) is array:
+        return values
+    values = _flat_storage(values)
+    return values if type(values) is array else None
+
+@contextmanager
+def _shared(*buffers):
+    """Скопировать массивы в общую память; выдаёт их описания для процессов"""
+    blocks = []
+    try:
+        for buffer in buffers:
+            size = len(buffer) * buffer.itemsize
+            block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            blocks.append(block)
+            block.buf[:size] = memoryview(buffer).cast("B")
+        yield [(block.name, buffer.typecode) for block, buffer in zip(blocks, buffers)]
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+def _attach(descriptor):
+    name, typecode = descriptor
+    block = shared_memory.SharedMemory(name=name)
+    return block, block.buf.cast(typecode)
+
+def _worker_multiply(a_descriptor, b_descriptor, start, stop, inner, cols, method):
+    """Строки [start, stop) произведения; операнды - в общей памяти"""
+    block_a, a = _attach(a_descriptor)
+    block_b, b = _attach(b_descriptor)
+    try:
+        a_rows = [a[i * inner:(i + 1) * inner].tolist() for i in range(start, stop)]
+        b_rows = [b[k * cols:(k + 1) * cols].tolist() for k in range(inner)]
+    finally:
+        a.release()
+        b.release()
+        block_a.close()
+        block_b.close()
+    return _multiply_serial(a_rows, b_rows, method)
+
+def _worker_add(a_descriptor, b_descriptor, start, stop):
+    """Кусок [start, stop) поэлементной суммы плоских буферов"""
+    block_a, a = _attach(a_descriptor)
+    block_b, b = _attach(b_descriptor)
+    try:
+        return list(map(operator.add, a[start:stop].tolist(), b[start:stop].tolist()))
+    finally:
+        a.release()
+        b.release()
+        block_a.close()
+        block_b.close()
+
+def _worker_eliminate(descriptor, n, k, start, stop):
+    """Исключить столбец k из строк [start, stop) прямо в общей памяти"""
+    block, m = _attach(descriptor)
+    try:
+        pivot_row = m[k * n + k:(k + 1) * n].tolist()
+        pivot, tail = pivot_row[0], pivot_row[1:]
+        for i in range(start, stop):
+            base = i * n
+            factor = m[base + k] / pivot
+            if factor:
+                row = m[base + k + 1:base + n].tolist()
+                m[base + k + 1:base + n] = array("d", [x - factor * y for x, y in zip(row, tail)])
+    finally:
+        m.release()
+        block.close()
+
+def _parallel_multiply(a, b, method):
+    """Произведение по блокам строк a в нескольких процессах; None - если
+    элементы нельзя передать через общую память (дроби, большие целые)"""
+    rows, inner, cols = len(a), len(b), len(b[0])
+    a_flat = _typed(x for row in a for x in row)
+    b_flat = _typed(x for row in b for x in row)
+    if a_flat is None or b_flat is None:
+        return None
+    with _shared(a_flat, b_flat) as (a_descriptor, b_descriptor):
+        futures = [_pool().submit(_worker_multiply, a_descriptor, b_descriptor,
+                                  start, stop, inner, cols, method)
+                   for start, stop in _blocks(0, rows, _WORKERS)]
+        return [row for future in futures for row in future.result()]
+
+def _parallel_add(a_flat, b_flat):
+    """Поэлементная сумма плоских буферов в нескольких процессах (или None)"""
+    a_flat, b_flat = _typed(a_flat), _typed(b_flat)
+    if a_flat is None or b_flat is None:
+        return None
+    with _shared(a_flat, b_flat) as (a_descriptor, b_descriptor):
+        futures = [_pool().submit(_worker_add, a_descriptor, b_descriptor, start, stop)
+                   for start, stop in _blocks(0, len(a_flat), _WORKERS)]
+        return [x for future in futures for x in future.result()]
+
+def _parallel_determinant(rows):
+    """LU-определитель вещественной матрицы: строки под ведущей делятся
+    между процессами на каждом шаге; None - если элементы не вещественные
+    
+    Выбор ведущего элемента и перестановка строк - в главном процессе.
+    Когда остаток становится меньше PARALLEL_MIN_SIZE, он досчитывается
+    последовательно: передача задач уже дороже самого исключения.
+    """
+    if not all(type(x) in (int, float) for row in rows for x in row):
+        return None
+    n = len(rows)
+    flat = array("d", [x for row in rows for x in row])
+    det = 1.0
+    with _shared(flat) as (descriptor,):
+        block, m = _attach(descriptor)
+        try:
+            for k in range(n):
+                if n - k < PARALLEL_MIN_SIZE:
+                    rest = [m[i * n + k:(i + 1) * n].tolist() for i in range(k, n)]
+                    return det * _determinant_lu(rest)
+                pivot_index = max(range(k, n), key=lambda i: abs(m[i * n + k]))
+                pivot = m[pivot_index * n + k]
+                if pivot == 0:
+                    return 0.0
+                if pivot_index != k:
+                    upper = m[k * n:(k + 1) * n].tolist()
+                    m[k * n:(k + 1) * n] = m[pivot_index * n:(pivot_index + 1) * n]
+                    m[pivot_index * n:(pivot_index + 1) * n] = array("d", upper)
+                    det = -det
+                det *= pivot
+                futures = [_pool().submit(_worker_eliminate, descriptor, n, k, start, stop)
+                           for start, stop in _blocks(k + 1, n, _WORKERS)]
+                for future in futures:
+                    future.result()
+            return det
+        finally:
+            m.release()
+            block.close()
+
+
+# ==================== ООП-СТИЛЬ ====================
+
+def _flat_storage(values):
+    """Упаковать элементы в плоский массив: array('q') для целых,
+    array('d') для вещественных, обычный список - для всего остального"""
+    values = list(values)
+    kinds = set(map(type, values))
+    if kinds == {int}:
+        try:
+            return array("q", values)
+        except OverflowError:  # Не помещается в int64 - храним как есть
+            return values
+    if kinds == {float}:
+        return array("d", values)
+    return values
+
+def _row_starts(rows, cols):
+    """Начала строк плотной матрицы rows x cols в плоском буфере
+    
+    Шаг не меньше 1, поэтому у матрицы без столбцов строки не теряются.
+    """
+    step = max(cols, 1)
+    return range(0, rows * step, step)
+
+
+class _MatrixRow:
+    """Строка матрицы как список: чтение и запись идут прямо в буфер"""
+    
+    __slots__ = ("_matrix", "_index")
+    __hash__ = None
+    
+    def __init__(self, matrix, index):
+        self._matrix = matrix
+        self._index = index
+    
+    def __len__(self):
+        return self._matrix.cols
+    
+    def __getitem__(self, j):
+        if isinstance(j, slice):
+            return [self._matrix[self._index, c] for c in range(*j.indices(len(self)))]
+        return self._matrix[self._index, j]
+    
+    def __setitem__(self, j, value):
+        if not isinstance(j, slice):
+            self._matrix[self._index, j] = value
+            return
+        cols = range(*j.indices(len(self)))
+        values = list(value)
+        if len(values) != len(cols):
+            raise ValueError("Длину строки матрицы изменить нельзя")
+        for c, x in zip(cols, values):
+            self._matrix[self._index, c] = x
+    
+    def __iter__(self):
+        return iter(self[:])
+    
+    def __eq__(self, other):
+        if isinstance(other, (list, _MatrixRow)):
+            return self[:] == list(other)
+        return NotImplemented
+    
+    def __repr__(self):
+        return repr(self[:])
+
+
+class _MatrixData:
+    """Матрица как список строк (Matrix.data) без копирования элементов"""
+    
+    __slots__ = ("_matrix",)
+    __hash__ = None
+    
+    def __init__(self, matrix):
+        self._matrix = matrix
+    
+    def __len__(self):
+        return self._matrix.rows
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [_MatrixRow(self._matrix, r) for r in range(self._matrix.rows)[i]]
+        return _MatrixRow(self._matrix, range(self._matrix.rows)[i])
+    
+    def __setitem__(self, i, row):
+        self[i][:] = row
+    
+    def __iter__(self):
+        return (_MatrixRow(self._matrix, i) for i in range(self._matrix.rows))
+    
+    def __eq__(self, other):
+        if isinstance(other, (list, _MatrixData)):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    def __repr__(self):
+        return repr(self._matrix._rows())
+
+
+class Matrix:
+    # Элементы лежат в плоском буфере построчно; элемент (i, j) находится
+    # по адресу _row_pos[i] + _col_pos[j]. Для обычной матрицы и срезов
+    # позиции - это range (смещение и шаг), поэтому транспонирование и
+    # срезы - представления за O(1), разделяющие буфер с исходной матрицей.
+    # Буфер лежит в общей ячейке _storage = [буфер]: если запись не подходит
+    # типу array, буфер заменяется списком сразу для всех представлений
+    __slots__ = ("_storage", "_row_pos", "_col_pos", "rows", "cols")
+    
+    def __init__(self, data):
+        self.rows = len(data)
+        self.cols = len(data[0]) if data else 0
+        if any(len(row) != self.cols for row in data):
+            raise ValueError("Все строки матрицы должны быть одной длины")
+        self._storage = [_flat_storage(x for row in data for x in row)]
+        self._row_pos = _row_starts(self.rows, self.cols)
+        self._col_pos = range(self.cols)
+    
+    @classmethod
+    def _view(cls, storage, row_pos, col_pos):
+        matrix = cls.__new__(cls)
+        matrix._storage = storage
+        matrix._row_pos = row_pos
+        matrix._col_pos = col_pos
+        matrix.rows = len(row_pos)
+        matrix.cols = len(col_pos)
+        return matrix
+    
+    @classmethod
+    def _from_flat(cls, values, rows, cols):
+        return cls._view([_flat_storage(values)], _row_starts(rows, cols), range(cols))
+    
+    @classmethod
+    def _from_array(cls, values):
+        # Результат NumPy копируется в array того же типа одним блоком
+        if values.dtype.kind == "f":
+            buffer = array("d", np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        else:
+            buffer = array("q", np.ascontiguousarray(values, dtype=np.int64).tobytes())
+        rows, cols = values.shape
+        return cls._view([buffer], _row_starts(rows, cols), range(cols))
+    
+    # ---- Хранилище и представления ----
+    
+    @property
+    def _buffer(self):
+        return self._storage[0]
+    
+    @property
+    def shape(self):
+        return self.rows, self.cols
+    
+    @property
+    def strides(self):
+        # Шаги по строке и столбцу в элементах буфера; None - если
+        # представление задано картой индексов (см. minor)
+        if type(self._row_pos) is range and type(self._col_pos) is range:
+            return self._row_pos.step, self._col_pos.step
+        return None
+    
+    def _is_dense(self):
+        # Матрица занимает весь буфер подряд, без пропусков и перестановок
+        return (len(self._buffer) == self.rows * self.cols
+                and self._row_pos == _row_starts(self.rows, self.cols)
+                and self._col_pos == range(self.cols))
+    
+    def _flat(self):
+        # Элементы построчно: сам буфер, если он плотный, иначе копия
+        if self._is_dense():
+            return self._buffer
+        buffer, col_pos = self._buffer, self._col_pos
+        return [buffer[p + c] for p in self._row_pos for c in col_pos]
+    
+    def _rows(self):
+        # Строки матрицы новыми списками
+        buffer, col_pos = self._buffer, self._col_pos
+        if type(col_pos) is range and col_pos.step == 1:
+            start, stop = col_pos.start, col_pos.stop
+            if type(buffer) is list:
+                return [buffer[p + start:p + stop] for p in self._row_pos]
+            return [buffer[p + start:p + stop].tolist() for p in self._row_pos]
+        return [[buffer[p + c] for c in col_pos] for p in self._row_pos]
+    
+    @property
+    def data(self):
+        # Список строк - представление: m.data[i][j] = x пишет в буфер
+        return _MatrixData(self)
+    
+    @data.setter
+    def data(self, data):
+        Matrix.__init__(self, data)
+    
+    def __getitem__(self, key):
+        # m[i, j] - элемент; m[срез, срез] (или с одним индексом) - представление
+        if not isinstance(key, tuple) or len(key) != 2:
+            raise TypeError("Индекс матрицы - пара (строка, столбец)")
+        i, j = key
+        if isinstance(i, int) and isinstance(j, int):
+            return self._buffer[self._row_pos[i] + self._col_pos[j]]
+        if isinstance(i, int):
+            i = self._row_pos[i]
+            rows = range(i, i + 1)
+        else:
+            rows = self._row_pos[i]
+        if isinstance(j, int):
+            j = self._col_pos[j]
+            cols = range(j, j + 1)
+        else:
+            cols = self._col_pos[j]
+        return Matrix._view(self._storage, rows, cols)
+    
+    def __setitem__(self, key, value):
+        i, j = key
+        position = self._row_pos[i] + self._col_pos[j]
+        buffer = self._buffer
+        # Значение другого типа (дробь в целом array, целое в вещественном)
+        # или целое вне int64 переводит буфер в список - для всех
+        # представлений сразу, как и _flat_storage для смешанных данных
+        if type(buffer) is array and type(value) is not {"q": int, "d": float}[buffer.typecode]:
+            buffer = self._storage[0] = buffer.tolist()
+        try:
+            buffer[position] = value
+        except OverflowError:
+            buffer = self._storage[0] = buffer.tolist()
+            buffer[position] = value
+    
+    def row(self, i):
+        # Строка i как представление 1 x cols
+        return self[i, :]
+    
+    def column(self, j):
+        # Столбец j как представление rows x 1
+        return self[:, j]
+    
+    def submatrix(self, row_start, row_stop, col_start, col_stop):
+        # Прямоугольный блок как представление за O(1)
+        return self[row_start:row_stop, col_start:col_stop]
+    
+    def minor(self, i, j):
+        # Матрица без строки i и столбца j - представление с картой индексов:
+        # буфер не копируется, но карта строк и столбцов строится за O(n)
+        rows = list(self._row_pos[:i]) + list(self._row_pos[i + 1:])
+        cols = list(self._col_pos[:j]) + list(self._col_pos[j + 1:])
+        return Matrix._view(self._storage, rows, cols)
+    
+    def lazy(self):
+        # Отложенное выражение: операторы строят дерево, считает evaluate()
+        return LazyMatrix(self)
+    
+    def to_sparse(self, format="csr"):
+        # Разреженная копия: "coo", "csr" или "csc"
+        formats = {"coo": COOMatrix, "csr": CSRMatrix, "csc": CSCMatrix}
+        if format not in formats:
+            raise ValueError(f"Неизвестный формат: {format}")
+        return formats[format].from_dense(self)
+    
+    def copy(self):
+        # Плотная копия с собственным буфером
+        return Matrix._from_flat(self._flat(), self.rows, self.cols)
+    
+    # ---- NumPy ----
+    
+    def _use_numpy(self, other=None):
+        """Стоит ли выполнять операцию в NumPy при текущем бэкенде"""
+        if np is None or _BACKEND == "python":
+            return False
+        if _BACKEND == "numpy":
+            return True
+        return any(max(m.rows, m.cols) >= NUMPY_MIN_SIZE for m in (self, other) if m is not None)
+    
+    def _numpy_array(self):
+        """Данные в виде ndarray или None, если тип элементов NumPy не подходит"""
+        buffer = self._buffer
+        if type(buffer) is array and self.strides is not None and self.rows and self.cols:
+            # Без копирования: ndarray смотрит в тот же буфер с теми же шагами
+            base = np.frombuffer(buffer, dtype=np.int64 if buffer.typecode == "q" else np.float64)
+            row_step, col_step = self.strides
+            return np.lib.stride_tricks.as_strided(
+                base[self._row_pos[0] + self._col_pos[0]:], shape=self.shape,
+                strides=(row_step * base.itemsize, col_step * base.itemsize), writeable=False)
+        values = np.array(self._rows())
+        # Дроби, комплексные и слишком большие целые считаем на чистом Python
+        return values if values.dtype.kind in "if" and values.ndim == 2 else None
+    
+    # ---- Операции ----
+    
+    def __add__(self, other):
+        if isinstance(other, SparseMatrix):
+            return other + self
+        if isinstance(other, LazyMatrix):
+            return NotImplemented
+        if self.rows != other.rows or self.cols != other.cols:
+            raise ValueError("Матрицы должны быть одного размера")
+        
+        if self._use_numpy(other):
+            a, b = self._numpy_array(), other._numpy_array()
+            if a is not None and b is not None and _exact_in_numpy(
+                    lambda: _int_bound(a) + _int_bound(b), a, b):
+                return Matrix._from_array(a + b)
+        
+        if _parallel_ok(self.rows, self.cols):
+            values = _parallel_add(self._flat(), other._flat())
+            if values is not None:
+                return Matrix._from_flat(values, self.rows, self.cols)
+        
+        return Matrix._from_flat(map(operator.add, self._flat(), other._flat()), self.rows, self.cols)
+    
+    def __mul__(self, other):
+        # Умножение на скаляр
+        if isinstance(other, (int, float)):
+            if self._use_numpy():
+                a = self._numpy_array()
+                if a is not None and (isinstance(other, float) or abs(other) < _INT64_LIMIT
+                                      and _exact_in_numpy(lambda: _int_bound(a) * abs(other), a)):
+                    return Matrix._from_array(a * other)
+            
+            return Matrix._from_flat([x * other for x in self._flat()], self.rows, self.cols)
+        
+        # Умножение матриц
+        elif isinstance(other, Matrix):
+            return self.multiply(other)
+        
+        elif isinstance(other, LazyMatrix):
+            return NotImplemented
+        
+        # Плотная на разреженную: (A * S) = (S^T * A^T)^T, транспонирования бесплатны
+        elif isinstance(other, SparseMatrix):
+            if self.cols != other.rows:
+                raise ValueError("Количество столбцов первой матрицы должно совпадать с количеством строк второй матрицы")
+            return (other.transpose() * self.transpose()).transpose()
+        
+        else:
+            raise TypeError("Неподдерживаемый тип операнда")
+    
+    def multiply(self, other, method=None):
+        # Произведение матриц; method выбирает алгоритм на чистом Python
+        # ("auto", "standard", "strassen"), None - глобальный режим
+        if self.cols != other.rows:
+            raise ValueError("Количество столбцов первой матрицы должно совпадать с количеством строк второй матрицы")
+        
+        if self._use_numpy(other):
+            a, b = self._numpy_array(), other._numpy_array()
+            if a is not None and b is not None and _exact_in_numpy(
+                    lambda: _int_bound(a) * _int_bound(b) * self.cols, a, b):
+                return Matrix._from_array(a @ b)
+        
+        return Matrix(_multiply(self._rows(), other._rows(), method))
+    
+    def transpose(self):
+        # Представление с переставленными осями - буфер не копируется
+        return Matrix._view(self._storage, self._col_pos, self._row_pos)
+    
+    def determinant(self):
+        if self.rows != self.cols:
+            raise ValueError("Матрица должна быть квадратной")
+        
+        # NumPy считает определитель в плавающей точке, поэтому целые
+        # матрицы всегда считаются точно на чистом Python
+        if self._use_numpy():
+            a = self._numpy_array()
+            if a is not None and a.dtype.kind == "f":
+                return float(np.linalg.det(a))
+        
+        # Базовый случай для матрицы 1x1
+        if self.rows == 1:
+            return self[0, 0]
+        
+        # Базовый случай для матрицы 2x2
+        if self.rows == 2:
+            return self[0, 0] * self[1, 1] - self[0, 1] * self[1, 0]
+        
+        # Исключение Гаусса (Барейса для целых и дробей) вместо разложения по строке
+        return _determinant(self._rows())
+    
+    def __str__(self):
+        return '\n'.join([' '.join(map(str, row)) for row in self._rows()])
+    
+    def __repr__(self):
+        return f"Matrix({self._rows()})"
+
+
+# ==================== РАЗРЕЖЕННЫЕ МАТРИЦЫ ====================
+
+def _compress(major_count, majors, minors, values):
+    """Сжать тройки (major, minor, значение) в indptr/indices/values
+    
+    Повторяющиеся позиции складываются, нули отбрасываются, внутри
+    каждой линии индексы упорядочены. O(nnz log nnz + major_count).
+    """
+    lines = {}
+    for major, minor, value in zip(majors, minors, values):
+        line = lines.setdefault(major, {})
+        line[minor] = line.get(minor, 0) + value
+    indptr = array("q", [0])
+    indices = []
+    data = []
+    for major in range(major_count):
+        line = lines.get(major)
+        if line:
+            for minor in sorted(line):
+                value = line[minor]
+                if value:
+                    indices.append(minor)
+                    data.append(value)
+        indptr.append(len(indices))
+    return indptr, array("q", indices), _flat_storage(data)
+
+
+class SparseMatrix(ABC):
+    """Общая часть разреженных матриц: хранятся только ненулевые элементы
+    
+    COOMatrix удобна для построения, CSRMatrix и CSCMatrix - для
+    вычислений. Стоимость операций зависит от числа ненулевых
+    элементов (nnz), а не от rows * cols.
+    """
+    
+    def __init__(self, rows, cols):
+        if rows < 0 or cols < 0:
+            raise ValueError("Размеры матрицы не могут быть отрицательными")
+        self.rows = rows
+        self.cols = cols
+    
+    @property
+    def shape(self):
+        return self.rows, self.cols
+    
+    @abstractmethod
+    def items(self):
+        """Тройки (строка, столбец, значение) хранимых элементов"""
+    
+    @classmethod
+    def from_dense(cls, matrix):
+        """Построить разреженную матрицу из Matrix или списка строк"""
+        rows = matrix._rows() if isinstance(matrix, Matrix) else matrix
+        coo = COOMatrix(len(rows), len(rows[0]) if rows else 0)
+        for i, row in enumerate(rows):
+            for j, value in enumerate(row):
+                if value:
+                    coo.append(i, j, value)
+        return coo if cls in (SparseMatrix, COOMatrix) else coo._convert(cls)
+    
+    def to_dense(self):
+        """Плотная Matrix с теми же элементами"""
+        rows = [[0] * self.cols for _ in range(self.rows)]
+        for i, j, value in self.items():
+            rows[i][j] += value
+        return Matrix(rows)
+    
+    def to_coo(self):
+        coo = COOMatrix(self.rows, self.cols)
+        for i, j, value in self.items():
+            coo.append(i, j, value)
+        return coo
+    
+    def to_csr(self):
+        return self._convert(CSRMatrix)
+    
+    def to_csc(self):
+        return self._convert(CSCMatrix)
+    
+    def _convert(self, cls):
+        if type(self) is cls:
+            return self
+        triples = list(self.items())
+        rows = [t[0] for t in triples]
+        cols = [t[1] for t in triples]
+        values = [t[2] for t in triples]
+        if cls is CSRMatrix:
+            return CSRMatrix(self.rows, self.cols, *_compress(self.rows, rows, cols, values))
+        return CSCMatrix(self.rows, self.cols, *_compress(self.cols, cols, rows, values))
+    
+    def __add__(self, other):
+        if self.shape != other.shape:
+            raise ValueError("Матрицы должны быть одного размера")
+        # Разреженная + плотная = плотная: прибавляем только ненулевые
+        if isinstance(other, Matrix):
+            rows = other._rows()
+            for i, j, value in self.items():
+                rows[i][j] += value
+            return Matrix(rows)
+        return self._compressed()._add(other)
+    
+    def __radd__(self, other):
+        return self + other
+    
+    def __mul__(self, other):
+        # Умножение на скаляр
+        if isinstance(other, (int, float)):
+            compressed = self._compressed()
+            values = [value * other for value in compressed.values]
+            return type(compressed)(self.rows, self.cols, *_drop_zeros(
+                compressed.indptr, compressed.indices, values))
+        if isinstance(other, (Matrix, SparseMatrix)):
+            if self.cols != other.rows:
+                raise ValueError("Количество столбцов первой матрицы должно совпадать с количеством строк второй матрицы")
+            if isinstance(other, Matrix):
+                return self.to_csr()._times_dense(other)
+            return self.to_csr()._times_sparse(other.to_csr())
+        raise TypeError("Неподдерживаемый тип операнда")
+    
+    def __rmul__(self, other):
+        # Скаляр слева; плотная матрица слева обрабатывается в Matrix.__mul__
+        return self * other
+    
+    @abstractmethod
+    def transpose(self):
+        """Транспонированная матрица"""
+    
+    def _compressed(self):
+        return self if isinstance(self, _CompressedMatrix) else self.to_csr()
+    
+    @property
+    @abstractmethod
+    def nnz(self):
+        """Число хранимых элементов"""
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({self.rows}x{self.cols}, nnz={self.nnz})"
+    
+    def __str__(self):
+        return str(self.to_dense())
+
+
+def _drop_zeros(indptr, indices, values):
+    """Убрать нулевые значения из сжатого представления"""
+    if all(values):
+        return indptr, indices, _flat_storage(values)
+    new_indptr = array("q", [0])
+    new_indices = []
+    new_values = []
+    for line in range(len(indptr) - 1):
+        for position in range(indptr[line], indptr[line + 1]):
+            if values[position]:
+                new_indices.append(indices[position])
+                new_values.append(values[position])
+        new_indptr.append(len(new_indices))
+    return new_indptr, array("q", new_indices), _flat_storage(new_values)
+
+
+class COOMatrix(SparseMatrix):
+    """Разреженная матрица в координатном формате - для построения
+    
+    Элементы просто дописываются тройками; повторы одной позиции
+    складываются при переходе в CSR/CSC.
+    """
+    
+    def __init__(self, rows, cols, entries=()):
+        super().__init__(rows, cols)
+        self.row_index = []
+        self.col_index = []
+        self.values = []
+        for i, j, value in entries:
+            self.append(i, j, value)
+    
+    def append(self, i, j, value):
+        """Добавить значение в позицию (i, j)"""
+        if not (0 <= i < self.rows and 0 <= j < self.cols):
+            raise IndexError("Индекс вне диапазона")
+        self.row_index.append(i)
+        self.col_index.append(j)
+        self.values.append(value)
+    
+    @property
+    def nnz(self):
+        return len(self.values)
+    
+    def items(self):
+        return zip(self.row_index, self.col_index, self.values)
+    
+    def transpose(self):
+        result = COOMatrix(self.cols, self.rows)
+        result.row_index = list(self.col_index)
+        result.col_index = list(self.row_index)
+        result.values = list(self.values)
+        return result
+
+
+class _CompressedMatrix(SparseMatrix):
+    """Сжатый формат: для каждой линии (строки в CSR, столбца в CSC)
+    indices[indptr[k]:indptr[k + 1]] - упорядоченные индексы ненулевых
+    элементов по другой оси, values - их значения"""
+    
+    ROW_MAJOR = True
+    
+    def __init__(self, rows, cols, indptr=None, indices=(), values=()):
+        super().__init__(rows, cols)
+        lines = rows if self.ROW_MAJOR else cols
+        # Готовые массивы не копируются - транспонирование их разделяет
+        if indptr is None:
+            indptr = [0] * (lines + 1)
+        self.indptr = indptr if isinstance(indptr, array) else array("q", indptr)
+        self.indices = indices if isinstance(indices, array) else array("q", indices)
+        self.values = values if isinstance(values, (array, list)) else _flat_storage(values)
+        if len(self.indptr) != lines + 1 or len(self.indices) != len(self.values):
+            raise ValueError("Несогласованные indptr, indices и values")
+    
+    @property
+    def nnz(self):
+        return len(self.values)
+    
+    def _line(self, k):
+        start, stop = self.indptr[k], self.indptr[k + 1]
+        return self.indices[start:stop], self.values[start:stop]
+    
+    def items(self):
+        indices, values, indptr = self.indices, self.values, self.indptr
+        for k in range(len(indptr) - 1):
+            for position in range(indptr[k], indptr[k + 1]):
+                if self.ROW_MAJOR:
+                    yield k, indices[position], values[position]
+                else:
+                    yield indices[position], k, values[position]
+    
+    def __getitem__(self, key):
+        i, j = key
+        major, minor = (i, j) if self.ROW_MAJOR else (j, i)
+        if not (0 <= i < self.rows and 0 <= j < self.cols):
+            raise IndexError("Индекс вне диапазона")
+        start, stop = self.indptr[major], self.indptr[major + 1]
+        position = bisect.bisect_left(self.indices, minor, start, stop)
+        if position < stop and self.indices[position] == minor:
+            return self.values[position]
+        return 0
+    
+    def transpose(self):
+        # Строки CSR - это столбцы транспонированной CSC: меняем только формат
+        other = CSCMatrix if self.ROW_MAJOR else CSRMatrix
+        return other(self.cols, self.rows, self.indptr, self.indices, self.values)
+    
+    def _add(self, other):
+        other = other._convert(type(self))
+        indptr = array("q", [0])
+        indices = []
+        values = []
+        for k in range(len(self.indptr) - 1):
+            own_indices, own_values = self._line(k)
+            other_indices, other_values = other._line(k)
+            if not other_indices:
+                indices.extend(own_indices)
+                values.extend(own_values)
+            else:
+                line = dict(zip(own_indices, own_values))
+                for minor, value in zip(other_indices, other_values):
+                    line[minor] = line.get(minor, 0) + value
+                for minor in sorted(line):
+                    if line[minor]:
+                        indices.append(minor)
+                        values.append(line[minor])
+            indptr.append(len(indices))
+        return type(self)(self.rows, self.cols, indptr, indices, _flat_storage(values))
+
+
+class CSRMatrix(_CompressedMatrix):
+    """Разреженная матрица, сжатая по строкам"""
+    
+    ROW_MAJOR = True
+    
+    def _times_dense(self, dense):
+        # Каждая строка результата - сумма строк dense с весами из строки self
+        dense_rows = dense._rows()
+        width = dense.cols
+        result = []
+        for k in range(self.rows):
+            out = [0] * width
+            for j, value in zip(*self._line(k)):
+                out = [o + value * x for o, x in zip(out, dense_rows[j])]
+            result.append(out)
+        return Matrix(result)
+    
+    def _times_sparse(self, other):
+        # Алгоритм Густавсона: строка результата накапливается в словаре
+        indptr = array("q", [0])
+        indices = []
+        values = []
+        for k in range(self.rows):
+            line = {}
+            for j, value in zip(*self._line(k)):
+                for minor, other_value in zip(*other._line(j)):
+                    line[minor] = line.get(minor, 0) + value * other_value
+            for minor in sorted(line):
+                if line[minor]:
+                    indices.append(minor)
+                    values.append(line[minor])
+            indptr.append(len(indices))
+        return CSRMatrix(self.rows, other.cols, indptr, indices, _flat_storage(values))
+
+
+class CSCMatrix(_CompressedMatrix):
+    """Разреженная матрица, сжатая по столбцам"""
+    
+    ROW_MAJOR = False
+
+
+# ==================== ОТЛОЖЕННЫЕ ВЫЧИСЛЕНИЯ ====================
+
+def _chain_order(dims):
+    """Оптимальный порядок умножения цепочки матриц (динамическое программирование)
+    
+    Матрица k имеет размер dims[k] x dims[k + 1]. Возвращает (число
+    умножений, таблица разбиений split[i][j]) за O(k³) по длине цепочки.
+    """
+    count = len(dims) - 1
+    cost = [[0] * count for _ in range(count)]
+    split = [[0] * count for _ in range(count)]
+    for length in range(2, count + 1):
+        for i in range(count - length + 1):
+            j = i + length - 1
+            cost[i][j], split[i][j] = min(
+                (cost[i][k] + cost[k + 1][j] + dims[i] * dims[k + 1] * dims[j + 1], k)
+                for k in range(i, j))
+    return (cost[0][count - 1] if count else 0), split
+
+def _chain_multiply(matrices):
+    """Перемножить цепочку Matrix в оптимальном порядке"""
+    dims = [matrices[0].rows] + [m.cols for m in matrices]
+    _, split = _chain_order(dims)
+    
+    def product(i, j):
+        if i == j:
+            return matrices[i]
+        k = split[i][j]
+        return product(i, k).multiply(product(k + 1, j))
+    
+    return product(0, len(matrices) - 1)
+
+def _fused_sum(coefficients, matrices):
+    """Линейная комбинация матриц за один проход без промежуточных матриц"""
+    first = matrices[0]
+    if len(matrices) == 1 and coefficients[0] == 1:
+        return first.copy()
+    if first._use_numpy():
+        # Крупные матрицы выгоднее складывать векторно в NumPy
+        result = first if coefficients[0] == 1 else first * coefficients[0]
+        for coefficient, matrix in zip(coefficients[1:], matrices[1:]):
+            result = result + (matrix if coefficient == 1 else matrix * coefficient)
+        return result
+    flats = [m._flat() for m in matrices]
+    if all(coefficient == 1 for coefficient in coefficients):
+        values = map(sum, zip(*flats))
+    else:
+        mul = operator.mul
+        values = [sum(map(mul, coefficients, column)) for column in zip(*flats)]
+    return Matrix._from_flat(values, first.rows, first.cols)
+
+
+class LazyMatrix:
+    """Отложенное выражение над Matrix (см. Matrix.lazy)
+    
+    Операторы не считают, а строят выражение, сразу приводя его к сумме
+    слагаемых вида коэффициент * (цепочка сомножителей). evaluate()
+    перемножает каждую цепочку в порядке с наименьшим числом операций
+    и складывает слагаемые с коэффициентами за один проход.
+    """
+    
+    __slots__ = ("rows", "cols", "_terms")
+    
+    def __init__(self, matrix):
+        self.rows = matrix.rows
+        self.cols = matrix.cols
+        self._terms = [(1, (matrix,))]
+    
+    @classmethod
+    def _from_terms(cls, rows, cols, terms):
+        expression = cls.__new__(cls)
+        expression.rows = rows
+        expression.cols = cols
+        expression._terms = terms
+        return expression
+    
+    @staticmethod
+    def _wrap(other):
+        return LazyMatrix(other) if isinstance(other, Matrix) else other
+    
+    @property
+    def shape(self):
+        return self.rows, self.cols
+    
+    def _as_factor(self):
+        # Один член - это коэффициент и цепочка; сумму умножаем как целое
+        if len(self._terms) == 1:
+            return self._terms[0]
+        return 1, (self,)
+    
+    def __add__(self, other):
+        other = self._wrap(other)
+        if not isinstance(other, LazyMatrix):
+            return NotImplemented
+        if self.shape != other.shape:
+            raise ValueError("Матрицы должны быть одного размера")
+        return LazyMatrix._from_terms(self.rows, self.cols, self._terms + other._terms)
+    
+    def __radd__(self, other):
+        return self._wrap(other) + self
+    
+    def __mul__(self, other):
+        # Умножение на скаляр
+        if isinstance(other, (int, float)):
+            return LazyMatrix._from_terms(self.rows, self.cols,
+                                          [(c * other, f) for c, f in self._terms])
+        other = self._wrap(other)
+        if not isinstance(other, LazyMatrix):
+            raise TypeError("Неподдерживаемый тип операнда")
+        if self.cols != other.rows:
+            raise ValueError("Количество столбцов первой матрицы должно совпадать с количеством строк второй матрицы")
+        (c1, f1), (c2, f2) = self._as_factor(), other._as_factor()
+        return LazyMatrix._from_terms(self.rows, other.cols, [(c1 * c2, f1 + f2)])
+    
+    def __rmul__(self, other):
+        if isinstance(other, (int, float)):
+            return self * other
+        return self._wrap(other) * self
+    
+    def transpose(self):
+        # (c * A B)^T = c * B^T A^T; транспонирование Matrix бесплатно
+        return LazyMatrix._from_terms(self.cols, self.rows, [
+            (c, tuple(f.transpose() for f in reversed(factors))) for c, factors in self._terms])
+    
+    def cost(self):
+        """Число скалярных умножений в цепочках при оптимальном порядке"""
+        total = 0
+        for _, factors in self._terms:
+            dims = [factors[0].rows] + [f.cols for f in factors]
+            total += _chain_order(dims)[0]
+            total += sum(f.cost() for f in factors if isinstance(f, LazyMatrix))
+        return total
+    
+    def evaluate(self):
+        """Вычислить выражение и вернуть Matrix"""
+        coefficients = []
+        products = []
+        for coefficient, factors in self._terms:
+            matrices = [f.evaluate() if isinstance(f, LazyMatrix) else f for f in factors]
+            coefficients.append(coefficient)
+            products.append(_chain_multiply(matrices))
+        return _fused_sum(coefficients, products)
+    
+    def __repr__(self):
+        return f"LazyMatrix({self.rows}x{self.cols}, слагаемых: {len(self._terms)})"
+
+
+# ==================== ФУНКЦИОНАЛЬНЫЙ СТИЛЬ ====================
+
+def create_matrix(data):
+    """Создает матрицу из списка списков"""
+    return data
+
+def matrix_rows(matrix):
+    """Возвращает количество строк матрицы"""
+    return len(matrix)
+
+def matrix_cols(matrix):
+    """Возвращает количество столбцов матрицы"""
+    return len(matrix[0]) if matrix else 0
+
+def matrix_add(m1, m2):
+    """Сложение матриц"""
+    if matrix_rows(m1) != matrix_rows(m2) or matrix_cols(m1) != matrix_cols(m2):
+        raise ValueError("Матрицы должны быть одного размера")
+    
+    cols = matrix_cols(m1)
+    if _parallel_ok(matrix_rows(m1), cols):
+        values = _parallel_add([x for row in m1 for x in row], [x for row in m2 for x in row])
+        if values is not None:
+            return [values[i:i + cols] for i in range(0, len(values), cols)]
+    
+    result = []
+    for i in range(matrix_rows(m1)):
+        row = []
+        for j in range(matrix_cols(m1)):
+            row.append(m1[i][j] + m2[i][j])
+        result.append(row)
+    return result
+
+def matrix_multiply(m1, m2, method=None):
+    """Умножение матриц (method - алгоритм, см. set_multiply_method)"""
+    if matrix_cols(m1) != matrix_rows(m2):
+        raise ValueError("Количество столбцов первой матрицы должно совпадать с количеством строк второй матрицы")
+    
+    return _multiply(m1, m2, method)
+
+def scalar_multiply(matrix, scalar):
+    """Умножение матрицы на скаляр"""
+    result = []
+    for i in range(matrix_rows(matrix)):
+        row = []
+        for j in range(matrix_cols(matrix)):
+            row.append(matrix[i][j] * scalar)
+        result.append(row)
+    return result
+
+def transpose(matrix):
+    """Транспонирование матрицы"""
+    result = []
+    for j in range(matrix_cols(matrix)):
+        row = []
+        for i in range(matrix_rows(matrix)):
+            row.append(matrix[i][j])
+        result.append(row)
+    return result
+
+def determinant(matrix):
+    """Вычисление определителя матрицы"""
+    if matrix_rows(matrix) != matrix_cols(matrix):
+        raise ValueError("Матрица должна быть квадратной")
+    
+    n = matrix_rows(matrix)
+    
+    # Базовый случай для матрицы 1x1
+    if n == 1:
+        return matrix[0][0]
+    
+    # Базовый случай для матрицы 2x2
+    if n == 2:
+        return matrix[0][0] * matrix[1][1] - matrix[0][1] * matrix[1][0]
+    
+    # Исключение Гаусса (Барейса для целых и дробей) вместо разложения по строке
+    return _determinant(matrix)
+
+def print_matrix(matrix):
+    """Печать матрицы"""
+    for row in matrix:
+        print(' '.join(map(str, row)))
+
+
+# ==================== ТЕСТИРОВАНИЕ ОБОИХ СТИЛЕЙ ====================
+
+def test_oop_style():
+    print("=== ТЕСТИРОВАНИЕ ООП-СТИЛЯ ===")
+    m1 = Matrix([[1, 2], [2, 3]])
+    m2 = Matrix([[2, 5], [7, 9]])
+    
+    print("Матрица m1:")
+    print(m1)
+    print("\nМатрица m2:")
+    print(m2)
+    
+    m3 = m1 + m2
+    print("\nm1 + m2:")
+    print(m3)
+    
+    m4 = m1 * m2
+    print("\nm1 * m2:")
+    print(m4)
+    
+    m5 = m1.transpose()
+    print("\nТранспонированная m1:")
+    print(m5)
+    
+    m6 = m1 * 3
+    print("\nm1 * 3:")
+    print(m6)
+    
+    det = m1.determinant()
+    print(f"\nОпределитель m1: {det}")
+    
+    return m1, m2, m3, m4, m5, m6, det
+
+def test_functional_style():
+    print("\n\n=== ТЕСТИРОВАНИЕ ФУНКЦИОНАЛЬНОГО СТИЛЯ ===")
+    m1 = create_matrix([[1, 2], [2, 3]])
+    m2 = create_matrix([[2, 5], [7, 9]])
+    
+    print("Матрица m1:")
+    print_matrix(m1)
+    print("\nМатрица m2:")
+    print_matrix(m2)
+    
+    m3 = matrix_add(m1, m2)
+    print("\nm1 + m2:")
+    print_matrix(m3)
+    
+    m4 = matrix_multiply(m1, m2)
+    print("\nm1 * m2:")
+    print_matrix(m4)
+    
+    m5 = transpose(m1)
+    print("\nТранспонированная m1:")
+    print_matrix(m5)
+    
+    m6 = scalar_multiply(m1, 3)
+    print("\nm1 * 3:")
+    print_matrix(m6)
+    
+    det = determinant(m1)
+    print(f"\nОпределитель m1: {det}")
+    
+    return m1, m2, m3, m4, m5, m6, det
+
+def compare_results(oop_results, func_results):
+    print("\n\n=== СРАВНЕНИЕ РЕЗУЛЬТАТОВ ===")
+    
+    # Извлекаем результаты из кортежей
+    oop_m1, oop_m2, oop_m3, oop_m4, oop_m5, oop_m6, oop_det = oop_results
+    func_m1, func_m2, func_m3, func_m4, func_m5, func_m6, func_det = func_results
+    
+    # Сравниваем каждую операцию
+    print("1. Сложение матриц:")
+    print(f"   ООП-результат: {oop_m3.data}")
+    print(f"   Функциональный результат: {func_m3}")
+    print(f"   Результаты совпадают: {oop_m3.data == func_m3}")
+    
+    print("\n2. Умножение матриц:")
+    print(f"   ООП-результат: {oop_m4.data}")
+    print(f"   Функциональный результат: {func_m4}")
+    print(f"   Результаты совпадают: {oop_m4.data == func_m4}")
+    
+    print("\n3. Транспонирование:")
+    print(f"   ООП-результат: {oop_m5.data}")
+    print(f"   Функциональный результат: {func_m5}")
+    print(f"   Результаты совпадают: {oop_m5.data == func_m5}")
+    
+    print("\n4. Умножение на скаляр:")
+    print(f"   ООП-результат: {oop_m6.data}")
+    print(f"   Функциональный результат: {func_m6}")
+    print(f"   Результаты совпадают: {oop_m6.data == func_m6}")
+    
+    print("\n5. Определитель:")
+    print(f"   ООП-результат: {oop_det}")
+    print(f"   Функциональный результат: {func_det}")
+    print(f"   Результаты совпадают: {oop_det == func_det}")
+
+def main():
+    print("=" * 50)
+    print("Лабораторная работа 2: Матрицы")
+    print("Реализация в ООП и функциональном стиле")
+    print("=" * 50)
+    
+    # Тестируем ООП-стиль
+    oop_results = test_oop_style()
+    
+    # Тестируем функциональный стиль
+    func_results = test_functional_style()
+    
+    # Сравниваем результаты
+    compare_results(oop_results, func_results)
+    
+    # Дополнительный пример с матрицами 3x3
+    print("\n\n" + "=" * 50)
+    print("ДОПОЛНИТЕЛЬНЫЙ ПРИМЕР (матрицы 3x3):")
+    print("=" * 50)
+    
+    # ООП-стиль
+    print("\nООП-стиль:")
+    m1_oop = Matrix([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+    m2_oop = Matrix([[9, 8, 7], [6, 5, 4], [3, 2, 1]])
+    print(f"Матрица 1:\n{m1_oop}")
+    print(f"\nМатрица 2:\n{m2_oop}")
+    print(f"\nСумма:\n{m1_oop + m2_oop}")
+    print(f"\nПроизведение:\n{m1_oop * m2_oop}")
+    print(f"\nОпределитель матрицы 1: {m1_oop.determinant()}")
+    
+    # Функциональный стиль
+    print("\nФункциональный стиль:")
+    m1_func = create_matrix([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+    m2_func = create_matrix([[9, 8, 7], [6, 5, 4], [3, 2, 1]])
+    print("Матрица 1:")
+    print_matrix(m1_func)
+    print("\nМатрица 2:")
+    print_matrix(m2_func)
+    print("\nСумма:")
+    print_matrix(matrix_add(m1_func, m2_func))
+    print("\nПроизведение:")
+    print_matrix(matrix_multiply(m1_func, m2_func))
+    print(f"\nОпределитель матрицы 1: {determinant(m1_func)}")
+
+# ==================== БЕНЧМАРКИ ====================
+
+def _random_matrix(n, kind, seed=0):
+    """Случайная матрица n x n с целыми ("int") или вещественными ("float") элементами"""
+    rng = random.Random(seed)
+    if kind == "int":
+        return [[rng.randint(-9, 9) for _ in range(n)] for _ in range(n)]
+    return [[rng.uniform(-1.0, 1.0) for _ in range(n)] for _ in range(n)]
+
+def _time_call(function, *args):
+    """Время одного вызова в секундах"""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def _determinant_laplace(rows):
+    """Прежний алгоритм - разложение по первой строке, O(n!) (для сравнения)"""
+    n = len(rows)
+    if n == 1:
+        return rows[0][0]
+    if n == 2:
+        return rows[0][0] * rows[1][1] - rows[0][1] * rows[1][0]
+    return sum((-1) ** j * rows[0][j] * _determinant_laplace([row[:j] + row[j + 1:] for row in rows[1:]])
+               for j in range(n))
+
+def benchmark_determinant(sizes=(4, 6, 8, 50, 100, 200, 500), laplace_max=8, exact_max=200):
+    """Сравнить разложение по строке с исключением Барейса и LU
+    
+    Точный определитель целой матрицы 500 x 500 содержит больше тысячи
+    цифр, и Барейс считает его минуты - поэтому целые матрицы по
+    умолчанию ограничены размером exact_max.
+    """
+    print("\n=== БЕНЧМАРК: ОПРЕДЕЛИТЕЛЬ ===")
+    print(f"{'n':>5} {'тип':>6} {'разложение, с':>15} {'исключение, с':>15} {'ускорение':>10}")
+    for n in sizes:
+        for kind in ("int", "float"):
+            if kind == "int" and n > exact_max:
+                continue
+            rows = _random_matrix(n, kind, seed=n)
+            fast = _time_call(_determinant, rows)
+            if n <= laplace_max:
+                slow = _time_call(_determinant_laplace, rows)
+                print(f"{n:>5} {kind:>6} {slow:>15.4f} {fast:>15.4f} {slow / fast:>9.0f}x")
+            else:
+                print(f"{n:>5} {kind:>6} {'-':>15} {fast:>15.4f} {'-':>10}")
+
+
+def _multiply_naive(a, b):
+    """Прежний алгоритм - цикл i-j-k с индексацией по столбцу (для сравнения)"""
+    result = []
+    for i in range(len(a)):
+        row = []
+        for j in range(len(b[0])):
+            sum_val = 0
+            for k in range(len(b)):
+                sum_val += a[i][k] * b[k][j]
+            row.append(sum_val)
+        result.append(row)
+    return result
+
+def benchmark_multiply(sizes=(100, 200, 400)):
+    """Сравнить прежнее умножение с блочным ядром _gemm"""
+    print("\n=== БЕНЧМАРК: УМНОЖЕНИЕ ===")
+    print(f"{'n':>5} {'тип':>6} {'i-j-k, с':>12} {'блочное, с':>12} {'ускорение':>10}")
+    for n in sizes:
+        for kind in ("int", "float"):
+            a, b = _random_matrix(n, kind, seed=n), _random_matrix(n, kind, seed=n + 1)
+            slow = _time_call(_multiply_naive, a, b)
+            fast = _time_call(_gemm, a, b)
+            print(f"{n:>5} {kind:>6} {slow:>12.3f} {fast:>12.3f} {slow / fast:>9.1f}x")
+
+def benchmark_strassen(sizes=(64, 128, 256, 512), cutoffs=(32, 64, 128), naive_max=256):
+    """Найти точку, с которой Штрассен обгоняет обычное и блочное умножение"""
+    print("\n=== БЕНЧМАРК: ШТРАССЕН ===")
+    header = " ".join(f"{'отсечка ' + str(c) + ', с':>15}" for c in cutoffs)
+    print(f"{'n':>5} {'тип':>6} {'i-j-k, с':>10} {'блочное, с':>11} {header}")
+    for kind in ("int", "float"):
+        crossover = None
+        for n in sizes:
+            a, b = _random_matrix(n, kind, seed=n), _random_matrix(n, kind, seed=n + 1)
+            naive = _time_call(_multiply_naive, a, b) if n <= naive_max else None
+            blocked = _time_call(_gemm, a, b)
+            recursive = [_time_call(_strassen_multiply, a, b, cutoff) for cutoff in cutoffs]
+            # Учитываем только отсечки меньше n - при остальных рекурсии нет;
+            # точка перехода - размер, начиная с которого Штрассен быстрее всегда
+            faster = any(r < blocked for r, cutoff in zip(recursive, cutoffs) if cutoff < n)
+            crossover = (crossover or n) if faster else None
+            naive_text = "-" if naive is None else f"{naive:.3f}"
+            print(f"{n:>5} {kind:>6} {naive_text:>10} {blocked:>11.3f} "
+                  + " ".join(f"{r:>15.3f}" for r in recursive))
+        print(f"{kind}: Штрассен быстрее блочного ядра начиная с n = {crossover or '-'}")
+
+def benchmark_lazy(n=300, thin=10):
+    """Сравнить немедленные вычисления с отложенными (LazyMatrix)"""
+    print("\n=== БЕНЧМАРК: ОТЛОЖЕННЫЕ ВЫЧИСЛЕНИЯ ===")
+    tall = Matrix([row[:thin] for row in _random_matrix(n, "float", seed=1)])
+    wide = Matrix(_random_matrix(n, "float", seed=2)[:thin])
+    
+    # Цепочка n x thin * thin x n * n x thin: слева направо - O(n² * thin)
+    chain_eager = _time_call(lambda: tall * wide * tall)
+    chain_lazy = _time_call(lambda: (tall.lazy() * wide * tall).evaluate())
+    naive_cost = n * thin * n + n * n * thin
+    optimal_cost = (tall.lazy() * wide * tall).cost()
+    print(f"Цепочка {n}x{thin} * {thin}x{n} * {n}x{thin}: умножений {naive_cost} -> {optimal_cost}")
+    print(f"  немедленно: {chain_eager:.4f} с, отложенно: {chain_lazy:.4f} с")
+    
+    # Линейная комбинация: одна запись результата вместо трёх временных матриц
+    a, b, c = (Matrix(_random_matrix(n, "float", seed=seed)) for seed in (3, 4, 5))
+    sum_eager = _time_call(lambda: a + b * 2 + c * 3)
+    sum_lazy = _time_call(lambda: (a.lazy() + b.lazy() * 2 + c.lazy() * 3).evaluate())
+    print(f"a + b*2 + c*3 ({n}x{n}): немедленно {sum_eager:.4f} с, отложенно {sum_lazy:.4f} с")
+
+def benchmark_parallel(n=400, max_workers=None):
+    """Масштабирование умножения, сложения и определителя по числу процессов"""
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = sorted({1, max_workers} | {2 ** p for p in range(max_workers.bit_length()) if 2 ** p <= max_workers})
+    print(f"\n=== БЕНЧМАРК: ПАРАЛЛЕЛЬНЫЕ ВЫЧИСЛЕНИЯ (n = {n}, ядер: {os.cpu_count()}) ===")
+    print(f"{'процессов':>10} {'умножение, с':>13} {'сложение, с':>12} {'определитель, с':>16} {'ускорение':>10}")
+    a, b = Matrix(_random_matrix(n, "float", seed=1)), Matrix(_random_matrix(n, "float", seed=2))
+    backend, workers = get_backend(), get_workers()
+    set_backend("python")  # NumPy перехватил бы операции раньше процессов
+    try:
+        baseline = None
+        for count in counts:
+            set_workers(count)
+            if count > 1:
+                _pool().submit(int).result()  # Запуск процессов не входит в замер
+            times = (_time_call(a.multiply, b), _time_call(a.__add__, b), _time_call(a.determinant))
+            baseline = baseline or sum(times)
+            print(f"{count:>10} {times[0]:>13.3f} {times[1]:>12.3f} {times[2]:>16.3f} "
+                  f"{baseline / sum(times):>9.2f}x")
+    finally:
+        set_backend(backend)
+        set_workers(workers)
+
+
+def run_benchmarks():
+    """Запустить все бенчмарки модуля"""
+    benchmark_determinant()
+    benchmark_multiply()
+    benchmark_strassen()
+    benchmark_lazy()
+    benchmark_parallel()
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv[1:]:
+        run_benchmarks()
+    else:
+        main()
\ No newline at end of file